@@ -0,0 +1 @@
+"""Herramientas de línea de comandos para desarrollo y pruebas del portfolio"""
@@ -0,0 +1,97 @@
+"""Servidor HTTP local que imita la API de registros de Airtable
+
+Permite probar el formulario de contacto sin credenciales reales:
+
+    python -m tools.airtable_stub --port 8787 --fail-first 2 --latency 0.2
+    AIRTABLE_ENDPOINT_URL=http://127.0.0.1:8787 streamlit run portfolio.py
+
+Responde a POST /v0/<base>/<tabla> como ``batch_create``, guarda los registros
+en memoria y los expone en GET /_records. ``--fail-first`` responde 503 a las
+primeras N peticiones para ejercitar los reintentos.
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, fail_first=0, latency=0.0):
+        self.fail_first = fail_first
+        self.latency = latency
+        self.records = []
+        self.requests = 0
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+
+class AirtableStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/_records":
+            with self.state.lock:
+                return self._reply(200, {"records": list(self.state.records),
+                                         "requests": self.state.requests})
+        if self.path.startswith("/v0/meta/whoami"):
+            return self._reply(200, {"id": "usrStub", "scopes": ["data.records:write"]})
+        self._reply(404, {"error": "NOT_FOUND"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        with self.state.lock:
+            self.state.requests += 1
+            if self.state.requests <= self.state.fail_first:
+                return self._reply(503, {"error": "SERVICE_UNAVAILABLE"})
+            if not self.path.startswith("/v0/") or "records" not in payload:
+                return self._reply(422, {"error": "INVALID_REQUEST"})
+            created = [{"id": f"rec{next(self.state.ids):014d}",
+                        "createdTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+                        "fields": record.get("fields", {})}
+                       for record in payload["records"]]
+            self.state.records.extend(created)
+        self._reply(200, {"records": created})
+
+
+def make_server(host="127.0.0.1", port=0, fail_first=0, latency=0.0):
+    """Crea el servidor (puerto 0 = libre); usar server.server_address para la URL"""
+    server = ThreadingHTTPServer((host, port), AirtableStubHandler)
+    server.daemon_threads = True
+    server.state = StubState(fail_first, latency)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub local de la API de Airtable")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.fail_first, args.latency)
+    print(f"Airtable stub en http://{args.host}:{server.server_address[1]}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
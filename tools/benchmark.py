@@ -0,0 +1,313 @@
+"""Benchmark de portfolio.py con AppTest sobre datos sintéticos
+
+    python -m tools.benchmark                        # 10, 1k y 10k filas por CSV
+    python -m tools.benchmark --rows 10 1000 --save-baseline
+    python -m tools.benchmark --threshold 0.25       # falla si empeora >25 %
+
+Para cada tamaño genera CSV sintéticos (las imágenes son las de Images/) y
+ejecuta portfolio.py sin navegador en un proceso nuevo, con cachés en disco
+vacías y sin AIRTABLE_API_KEY. Mide una ejecución en frío y la mediana de
+``--repeat`` reruns en caliente:
+
+  total_seconds       duración de ``AppTest.run()``
+  table_load_seconds  lectura de los CSV
+  image_seconds       codificación base64 y generación de variantes
+  section_<tab>       construcción del HTML de cada sección (incluye lo anterior)
+  delta_bytes         tamaño serializado de los elementos enviados al navegador
+
+y el envío del formulario de contacto (columna "contacto"): lo que cuesta el
+rerun de su st.fragment (``fragment_seconds``, ``fragment_bytes``), que
+debe mantenerse plano aunque crezcan los datos.
+
+Con ``--baseline`` compara contra un resultado guardado y termina con código
+1 si alguna métrica empeora más de ``--threshold`` (los tiempos por debajo de
+``--min-seconds`` se consideran ruido).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils.settings import CACHE_DIR
+
+DEFAULT_ROWS = (10, 1000, 10000)
+DEFAULT_BASELINE = os.path.join(CACHE_DIR, "benchmark_baseline.json")
+SCRIPT = "portfolio.py"
+# st.container(key=...) que envuelve el fragmento del formulario de contacto
+CONTACT_BLOCK_KEY = "contact_section"
+RUN_LABELS = {"cold": "frío", "warm": "caliente", "contact": "contacto"}
+
+WORDS = ("data", "analysis", "python", "dashboard", "earth", "space", "model", "science",
+         "pandas", "insight", "visual", "report", "signal", "orbit", "survey", "cloud")
+PROJECT_IMAGES = ("Dashboard1_powerbi.png", "Dashboard_Exoplanets.png",
+                  "Dashboard_Reporte_delitos_2019.png", "Informe_PowerBI_01.png",
+                  "Juego_preguntas_ciencia.png", "Mapa_sismos_mexico.png", "Screen.png")
+
+
+# ========== DATOS SINTÉTICOS ==========
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_dataset(data_dir, rows, seed=0):
+    """Escribe los cinco CSV del portfolio con ``rows`` filas cada uno"""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    tables = {
+        "profile": pd.DataFrame({
+            "Name": [f"Person {i}" for i in range(rows)],
+            "Description": [sentence(rng, 40) for _ in range(rows)],
+            "Linkedin": "https://www.linkedin.com/", "GitHub": "https://github.com/",
+            "Instagram": "https://www.instagram.com/", "Picture": "perfil.jpg",
+            "Tagline": [sentence(rng, 6) for _ in range(rows)],
+        }),
+        "skills": pd.DataFrame({
+            "Name": [f"Skill {i}" for i in range(rows)],
+            "Notes": [sentence(rng, 30) for _ in range(rows)],
+        }),
+        "projects": pd.DataFrame({
+            "Name": [f"Project {i}" for i in range(rows)],
+            "Description": [sentence(rng, 50) for _ in range(rows)],
+            "Skills": [", ".join(rng.sample(WORDS, 4)) for _ in range(rows)],
+            "Knowledge": [", ".join(rng.sample(WORDS, 3)) for _ in range(rows)],
+            "Image": [PROJECT_IMAGES[i % len(PROJECT_IMAGES)] for i in range(rows)],
+            "Link": [f"https://example.com/project/{i}" for i in range(rows)],
+        }),
+        # Varias filas por (Name, Degree) para ejercitar la agrupación
+        "education": pd.DataFrame({
+            "Name": [f"University {i // 3}" for i in range(rows)],
+            "Degree": [f"Degree {i // 3}" for i in range(rows)],
+            "Knowledge": ["#".join(sentence(rng, 15) for _ in range(2)) for _ in range(rows)],
+            "Date": [f"{2000 + i % 25}" for i in range(rows)],
+        }),
+        "STEM": pd.DataFrame({
+            "Name": [f"Outreach {i}" for i in range(rows)],
+            "Description": [sentence(rng, 30) for _ in range(rows)],
+            "Instagram": "https://www.instagram.com/",
+        }),
+    }
+    for table_name, df in tables.items():
+        df.to_csv(os.path.join(data_dir, f"{table_name}.csv"), index=False)
+
+
+# ========== EJECUCIÓN (PROCESO HIJO) ==========
+
+
+def delta_bytes(node):
+    """Tamaño serializado de los protos de un árbol de AppTest"""
+    proto = getattr(node, "proto", None)
+    total = proto.ByteSize() if proto is not None else 0
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        total += sum(delta_bytes(child) for child in children.values())
+    return total
+
+
+def find_block(node, key):
+    """Bloque creado con ``st.container(key=key)``; None si no está en el árbol"""
+    proto = getattr(node, "proto", None)
+    if proto is not None and getattr(proto, "id", "").endswith(f"-{key}"):
+        return node
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            found = find_block(child, key)
+            if found is not None:
+                return found
+    return None
+
+
+def spent(before, after, name):
+    """Segundos acumulados en un histograma entre dos instantáneas de utils.metrics"""
+    return after.get(name, {}).get("sum", 0.0) - before.get(name, {}).get("sum", 0.0)
+
+
+def phase_seconds(before, after):
+    """Segundos acumulados por fase entre dos instantáneas de utils.metrics"""
+    phases = {
+        "table_load_seconds": spent(before, after, "table_load_seconds"),
+        "image_seconds": (spent(before, after, "image_encode_seconds")
+                          + spent(before, after, "image_resize_seconds")),
+    }
+    for name in after:
+        if name.startswith("section_") and name.endswith("_build_seconds"):
+            phases[name[:-len("_build_seconds")]] = spent(before, after, name)
+    return phases
+
+
+def measure_run(at, timeout):
+    """Ejecuta el script una vez y devuelve sus métricas"""
+    from utils import metrics
+
+    before = metrics.snapshot()
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    total = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{SCRIPT} lanzó una excepción: {at.exception[0].message}")
+    result = {"total_seconds": total, **phase_seconds(before, metrics.snapshot())}
+    result["delta_bytes"] = delta_bytes(at._tree)
+    return result
+
+
+def measure_contact(at, timeout):
+    """Envío del formulario de contacto: coste y bytes del rerun de su fragmento
+
+    AppTest no reproduce los reruns limitados a un st.fragment (cada run
+    ejecuta el script entero), así que se mide lo que costaría ese rerun: el
+    span del tab de contacto y el tamaño del bloque del formulario.
+    """
+    from utils import metrics
+
+    at.query_params["tab"] = "contact"  # con tabs perezosos, el de contacto
+    at.run(timeout=timeout)
+    at.text_input(key="contact_name").input("Benchmark")
+    at.text_input(key="contact_email").input("bench@example.com")
+    at.text_area(key="contact_notes").input("Hola")
+    next(button for button in at.button if button.label == "Send").click()
+
+    before = metrics.snapshot()
+    at.run(timeout=timeout)
+    block = find_block(at._tree, CONTACT_BLOCK_KEY)
+    return {
+        "fragment_seconds": spent(before, metrics.snapshot(), "tab_contact_seconds"),
+        "fragment_bytes": delta_bytes(block) if block is not None else 0,
+    }
+
+
+def run_child(repeat, timeout):
+    """Ejecución en frío y mediana de ``repeat`` reruns en caliente (en este proceso)"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(SCRIPT, default_timeout=timeout)
+    cold = measure_run(at, timeout)
+    warm_runs = [measure_run(at, timeout) for _ in range(repeat)]
+    warm = {key: statistics.median(run[key] for run in warm_runs) for key in warm_runs[0]}
+    return {"cold": cold, "warm": warm, "contact": measure_contact(at, timeout)}
+
+
+def run_dataset(rows, repeat, timeout, workdir):
+    """Genera los datos y lanza un proceso nuevo para medir con cachés vacías"""
+    data_dir = os.path.join(workdir, f"data-{rows}")
+    make_dataset(data_dir, rows)
+    env = {k: v for k, v in os.environ.items() if k != "AIRTABLE_API_KEY"}
+    env.update({
+        "PORTFOLIO_DATA_DIR": data_dir,
+        "PORTFOLIO_CACHE_DIR": os.path.join(workdir, f"cache-{rows}"),
+        "PORTFOLIO_CONTACT_QUEUE": os.path.join(workdir, f"queue-{rows}.sqlite3"),
+    })
+    output = subprocess.run(
+        [sys.executable, "-m", "tools.benchmark", "--child",
+         "--repeat", str(repeat), "--timeout", str(timeout)],
+        env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+# ========== COMPARACIÓN ==========
+
+
+def regressions(results, baseline, threshold, min_seconds, unit="filas", floors=None):
+    """Métricas que empeoran más de ``threshold`` respecto a la línea base
+
+    ``results`` y ``baseline``: {tamaño: {ejecución: {métrica: valor}}}; ``unit``
+    describe el tamaño en los mensajes (filas, sesiones...). Por debajo de su
+    umbral una métrica se considera ruido: ``floors`` fija el de cada métrica
+    ({métrica: valor}); si no, 0 para las de bytes y ``min_seconds`` para los tiempos.
+
+    >>> base = {"8": {"load": {"bytes_per_session": 1_800_000, "rss_growth_bytes": 2e6}}}
+    >>> now = {"8": {"load": {"bytes_per_session": 3_600_000, "rss_growth_bytes": 4e6}}}
+    >>> regressions(now, base, 0.2, 0.01, "sesiones", {"rss_growth_bytes": 16 * 2**20})
+    ['8 sesiones, load, bytes_per_session: 1,800,000 -> 3,600,000']
+    """
+    floors = floors or {}
+    found = []
+    for rows, runs in results.items():
+        for run_name, values in runs.items():
+            base_values = baseline.get(rows, {}).get(run_name, {})
+            for key, value in values.items():
+                base = base_values.get(key)
+                if base is None:
+                    continue
+                floor = floors.get(key, 0 if "bytes" in key else min_seconds)
+                if max(value, base) < floor:
+                    continue
+                if value > base * (1 + threshold):
+                    fmt = "{:,.0f}" if "bytes" in key else "{:.4f}"
+                    found.append(f"{rows} {unit}, {run_name}, {key}: "
+                                 f"{fmt.format(base)} -> {fmt.format(value)}")
+    return found
+
+
+def print_table(results):
+    keys = sorted({key for runs in results.values() for run in runs.values() for key in run})
+    for rows, runs in results.items():
+        print(f"\n== {rows} filas ==")
+        print(f"{'métrica':<28}" + "".join(f"{RUN_LABELS.get(run, run):>14}" for run in runs))
+        for key in keys:
+            fmt = "{:>14.0f}" if "bytes" in key else "{:>14.4f}"
+            values = (run.get(key) for run in runs.values())
+            print(f"{key:<28}" + "".join(fmt.format(v) if v is not None else f"{'-':>14}"
+                                          for v in values))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de portfolio.py con AppTest")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--repeat", type=int, default=3, help="reruns en caliente por tamaño")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guarda el resultado como nueva línea base")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="empeoramiento relativo tolerado (0.2 = 20 %%)")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="tiempos menores se ignoran al comparar")
+    parser.add_argument("--json", help="escribe también los resultados en este archivo")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.repeat, args.timeout)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="portfolio-bench-") as workdir:
+        results = {}
+        for rows in args.rows:
+            print(f"Ejecutando con {rows} filas por CSV...", file=sys.stderr)
+            results[str(rows)] = run_dataset(rows, args.repeat, args.timeout, workdir)
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nLínea base guardada en {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(results, json.load(f), args.threshold, args.min_seconds)
+        if found:
+            print(f"\n❌ Regresiones (> {args.threshold:.0%}):")
+            for line in found:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"\n✅ Sin regresiones respecto a {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Receptor mínimo del formulario de contacto para el sitio estático exportado
+
+    AIRTABLE_API_KEY=... python -m tools.contact_endpoint --port 8788
+
+Acepta POST /api/contact (form-urlencoded o JSON), valida los campos igual
+que la app, guarda el mensaje en la misma cola SQLite (utils.contact) y
+responde sin esperar a Airtable: 303 a ``--redirect`` para formularios HTML
+o 202 con el id en la cola para peticiones JSON. El worker de la cola los
+envía por lotes en segundo plano. Se coloca detrás del servidor de archivos
+(p. ej. ``location /api/contact { proxy_pass http://127.0.0.1:8788; }``).
+"""
+import argparse
+import json
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from utils.contact import airtable_tables, get_contact_queue, resume_pending
+from utils.settings import AIRTABLE_BASE_ID
+
+FIELDS = ("Name", "Email", "PhoneNumber", "Notes")
+REQUIRED = ("Name", "Email", "Notes")
+# Límite del cuerpo de la petición (bytes)
+MAX_BODY = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class ContactHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.info(format, *args)
+
+    def _reply(self, status, payload=None, headers=()):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body_length(self):
+        """Content-Length de la petición; -1 si no es un entero"""
+        try:
+            return int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return -1
+
+    def _reject(self, status, error):
+        """Responde sin leer el cuerpo y cierra la conexión
+
+        Con HTTP/1.1 los bytes sin leer se interpretarían como la siguiente
+        petición de la conexión keep-alive.
+        """
+        self.close_connection = True
+        self._reply(status, {"error": error}, headers=(("Connection", "close"),))
+
+    def _read_fields(self, length):
+        """Campos del formulario; None si el cuerpo no es válido (ValueError si no se puede leer)"""
+        raw = self.rfile.read(length)
+        if self.headers.get_content_type() == "application/json":
+            # JSONDecodeError y UnicodeDecodeError son ValueError
+            data = json.loads(raw or b"{}")
+        else:
+            data = {k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()}
+        if not isinstance(data, dict):
+            return None
+        return {name: str(data.get(name, "")).strip() for name in FIELDS}
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0] != self.server.path:
+            return self._reject(404, "NOT_FOUND")
+        length = self._body_length()
+        if length < 0:
+            return self._reject(400, "INVALID_REQUEST")
+        if length > MAX_BODY:
+            return self._reject(413, "PAYLOAD_TOO_LARGE")
+        wants_json = self.headers.get_content_type() == "application/json"
+        try:
+            fields = self._read_fields(length)
+        except ValueError:
+            fields = None
+        if fields is None:
+            return self._reply(400, {"error": "INVALID_REQUEST"})
+        missing = [name for name in REQUIRED if not fields[name]]
+        if missing:
+            return self._reply(422, {"error": "MISSING_FIELDS", "fields": missing})
+
+        queue = get_contact_queue()
+        if self.server.make_table is not None:
+            queue.start(self.server.make_table)
+        submission_id = queue.enqueue(fields)
+        if wants_json:
+            return self._reply(202, {"id": submission_id, "status": queue.status(submission_id)})
+        self._reply(303, headers=(("Location", self.server.redirect),))
+
+    def do_GET(self):
+        # Estado de un envío: GET /api/contact?id=<id>
+        path, _, query = self.path.partition("?")
+        ids = parse_qs(query).get("id")
+        if path != self.server.path or not ids or not ids[0].isdigit():
+            return self._reply(404, {"error": "NOT_FOUND"})
+        status = get_contact_queue().status(int(ids[0]))
+        self._reply(200 if status else 404, {"id": int(ids[0]), "status": status})
+
+
+def make_server(host="127.0.0.1", port=0, path="/api/contact", redirect="/thanks.html",
+                api_key=None, base_id=AIRTABLE_BASE_ID):
+    """Crea el servidor; sin ``api_key`` sólo encola (el worker no arranca)"""
+    server = ThreadingHTTPServer((host, port), ContactHandler)
+    server.daemon_threads = True
+    server.path = path
+    server.redirect = redirect
+    server.make_table = airtable_tables(api_key, base_id) if api_key else None
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Receptor del formulario de contacto del sitio estático")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--path", default="/api/contact")
+    parser.add_argument("--redirect", default="/thanks.html",
+                        help="página a la que se redirige tras enviar el formulario HTML")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    api_key = os.environ.get("AIRTABLE_API_KEY")
+    if not api_key:
+        print("⚠️ AIRTABLE_API_KEY no definida: los mensajes se guardan en la cola sin enviarse")
+    server = make_server(args.host, args.port, args.path, args.redirect, api_key)
+    # Los mensajes que quedaron en cola de la ejecución anterior se envían ya
+    resume_pending(lambda: api_key)
+    print(f"Formulario de contacto en http://{args.host}:{server.server_address[1]}{args.path}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Exporta el portfolio como sitio estático precomprimido
+
+    python -m tools.export_static --out dist --contact-endpoint /api/contact
+
+Usa la misma normalización y las mismas plantillas que la app (utils.records
+y utils.render) y escribe:
+
+  dist/index.html             perfil y todas las secciones en una sola página
+  dist/thanks.html            página a la que redirige el endpoint de contacto
+  dist/assets/site.<hash>.css CSS vendorizado + CSS propio, con hash en el nombre
+  dist/assets/img/...         variantes de las imágenes con hash en el nombre
+  dist/assets/vendor/...      fuentes de iconos (si se ejecutó tools.vendor_assets)
+
+Cada archivo de texto se acompaña de su versión .gz (y .br si está instalado
+brotli) para servirlos precomprimidos con cualquier servidor de archivos
+(nginx ``gzip_static``/``brotli_static``, Caddy ``precompressed``...). El
+formulario de contacto se envía a ``--contact-endpoint``; ver
+tools.contact_endpoint para el receptor que reutiliza la cola de mensajes.
+"""
+import argparse
+import gzip
+import hashlib
+import html
+import os
+import re
+import shutil
+import sys
+
+from utils.data import read_table
+from utils.derivatives import publishing_images
+from utils.fragments import SECTIONS, TAB_LABELS, page_title
+from utils.settings import STATIC_DIR
+from utils.static import STATIC_URL_PREFIX, content_hash
+from utils.styles import EXTERNAL_STYLESHEETS, stylesheet_bundle, vendor_bundle
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli sólo se generan los .gz
+    brotli = None
+
+# Extensiones que se precomprimen (imágenes y woff2 ya van comprimidos)
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".svg", ".txt")
+
+# Fuentes vendorizadas referenciadas desde el CSS incrustado en la app
+STATIC_URL_RE = re.compile(rf"url\({re.escape(STATIC_URL_PREFIX)}/([^)?]+)(?:\?[^)]*)?\)")
+
+CONTACT_INTRO = ("If you think I can help you with some of your projects or entrepreneurships, "
+                 "send me a message I'll contact you as soon as I can. I'm always glad to help")
+
+# Estilos propios de la página exportada (en la app los aporta Streamlit)
+EXPORT_CSS = (
+    ".stApp{min-height:100vh}"
+    ".site-nav{position:sticky;top:0;z-index:10}"
+    ".site-nav a{font-size:18px}"
+    ".site-section{padding-top:24px}"
+)
+
+
+class AssetWriter:
+    """Copia archivos a <out>/assets/<subdir>/ con hash en el nombre"""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self._urls = {}
+
+    def publish(self, path, subdir="img"):
+        """URL relativa a la raíz del sitio; None si el archivo no existe"""
+        path = os.path.abspath(path)
+        if path in self._urls:
+            return self._urls[path]
+        if not os.path.exists(path):
+            return None
+        stem, ext = os.path.splitext(os.path.basename(path))
+        filename = f"{stem}.{content_hash(path)}{ext.lower()}"
+        target_dir = os.path.join(self.out_dir, "assets", subdir)
+        os.makedirs(target_dir, exist_ok=True)
+        shutil.copyfile(path, os.path.join(target_dir, filename))
+        url = f"assets/{subdir}/{filename}"
+        self._urls[path] = url
+        return url
+
+    def write_text(self, relpath, text):
+        """Escribe un archivo de texto del sitio y devuelve su ruta"""
+        path = os.path.join(self.out_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+
+def render_sections(writer):
+    """HTML de cada sección con las plantillas de la app; imprime los avisos"""
+    fragments = {}
+    with publishing_images(writer.publish):
+        for name, (table_name, normalize, render) in SECTIONS.items():
+            fragment = render(normalize(read_table(table_name)))
+            for warning in fragment.warnings:
+                print(warning, file=sys.stderr)
+            fragments[name] = fragment.html
+    return fragments
+
+
+def site_stylesheet(writer):
+    """Escribe la hoja de estilo única (con hash) y devuelve las etiquetas del <head>"""
+    vendor = vendor_bundle()
+    links = ""
+    css = ""
+    if vendor is None:
+        links = "".join(EXTERNAL_STYLESHEETS)
+    else:
+        # Las fuentes ya tienen hash en el nombre; se copian tal cual y la URL
+        # pasa a ser relativa a assets/ (donde queda la hoja de estilo)
+        def relocate(match):
+            relpath = match.group(1)
+            target = os.path.join(writer.out_dir, "assets", relpath)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(os.path.join(STATIC_DIR, relpath), target)
+            return f"url({relpath})"
+        css = STATIC_URL_RE.sub(relocate, vendor.css)
+    css += stylesheet_bundle().css + EXPORT_CSS
+    digest = hashlib.sha256(css.encode()).hexdigest()[:16]
+    url = f"assets/site.{digest}.css"
+    writer.write_text(url, css)
+    return links + f'<link rel="stylesheet" href="{url}">'
+
+
+def contact_form(endpoint):
+    """Formulario HTML equivalente al de la app; se envía al endpoint indicado"""
+    return f"""
+    <div class="card-panel light-blue lighten-5">{CONTACT_INTRO}</div>
+    <form class="card-panel" method="post" action="{html.escape(endpoint, quote=True)}">
+      <div class="input-field"><input id="contact-name" name="Name" type="text" required><label class="active" for="contact-name">Your name</label></div>
+      <div class="input-field"><input id="contact-email" name="Email" type="email" required><label class="active" for="contact-email">Your email</label></div>
+      <div class="input-field"><input id="contact-phone" name="PhoneNumber" type="tel"><label class="active" for="contact-phone">WhatsApp phone number, with country code</label></div>
+      <div class="input-field"><textarea id="contact-notes" name="Notes" class="materialize-textarea" required></textarea><label class="active" for="contact-notes">What can I do for you</label></div>
+      <button class="btn blue darken-3" type="submit">Send</button>
+    </form>
+    """
+
+
+def page(title, head, body):
+    """Documento HTML completo"""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title>
+<link rel="icon" href="data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>🌌</text></svg>">
+{head}
+</head>
+<body class="stApp">
+<main class="container">
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+def index_body(fragments, endpoint):
+    """Perfil, navegación por anclas y una sección por tab"""
+    nav = "".join(f'<li><a class="blue-text text-darken-3" href="#{key}">{label}</a></li>'
+                  for key, label in TAB_LABELS.items())
+    sections = []
+    for key, label in TAB_LABELS.items():
+        content = contact_form(endpoint) if key == "contact" else fragments[key]
+        sections.append(f'<section id="{key}" class="site-section"><h4>{label}</h4>{content}</section>')
+    return (fragments["profile"]
+            + f'<nav class="site-nav white z-depth-1"><div class="nav-wrapper"><ul>{nav}</ul></div></nav>'
+            + "".join(sections))
+
+
+def precompress(out_dir):
+    """Escribe .gz (y .br si hay brotli) junto a cada archivo de texto"""
+    written = 0
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            # mtime=0 para que la salida sea reproducible entre exportaciones
+            with open(f"{path}.gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(f"{path}.br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+            written += 1
+    return written
+
+
+def export(out_dir="dist", endpoint="/api/contact"):
+    """Genera el sitio completo en ``out_dir`` (se vacía antes)"""
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+    writer = AssetWriter(out_dir)
+
+    head = site_stylesheet(writer)
+    fragments = render_sections(writer)
+    # Título a partir del perfil exportado (Data/profile.csv)
+    title = page_title()
+    writer.write_text("index.html", page(title, head, index_body(fragments, endpoint)))
+    writer.write_text("thanks.html", page(title, head, """
+    <div class="card-panel center-align" style="margin-top: 48px;">
+      <h4>✅ Message received</h4>
+      <p>Thanks for writing! I'll contact you as soon as I can.</p>
+      <a class="btn blue darken-3" href="index.html">Back to the portfolio</a>
+    </div>
+    """))
+    return precompress(out_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta el portfolio como sitio estático")
+    parser.add_argument("--out", default="dist", help="carpeta de salida (se reemplaza)")
+    parser.add_argument("--contact-endpoint", default="/api/contact",
+                        help="URL a la que se envía el formulario de contacto")
+    args = parser.parse_args(argv)
+    compressed = export(args.out, args.contact_endpoint)
+    print(f"Sitio exportado en {args.out}/ ({compressed} archivos precomprimidos"
+          f"{'' if brotli else ', sin brotli'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""Prueba de carga de ``streamlit run portfolio.py`` con sesiones websocket concurrentes
+
+    python -m tools.loadtest                              # 1, 10 y 50 sesiones
+    python -m tools.loadtest --sessions 100 --rows 1000 --lazy-tabs
+    python -m tools.loadtest --sessions 10 50 --save-baseline
+    python -m tools.loadtest --threshold 0.25             # falla si empeora >25 %
+
+Para cada nivel de concurrencia arranca un servidor de Streamlit nuevo (con
+el stub de Airtable de tools.airtable_stub en lugar de la API real y una
+cola de contacto temporal), lo calienta con una sesión sin medir y abre N
+sesiones por el mismo websocket que usa el navegador (/_stcore/stream). Cada
+sesión, ``--iterations`` veces:
+
+  load            carga la página
+  tab:<clave>     visita cada tab (?tab=<clave>; con --lazy-tabs sólo se
+                  construye ese tab)
+  projects_page   pasa a la página 2 de Projects si hay más de una
+                  (rerun del st.fragment)
+  contact_submit  rellena y envía el formulario de contacto (rerun del
+                  st.fragment)
+
+Latencia = desde que se envía el BackMsg hasta el ``script_finished``. Se
+informa p50/p95/p99 por acción y en total, bytes recibidos por sesión, el
+RSS del servidor (en reposo tras calentar, pico y crecimiento) y cuántos
+mensajes llegaron al stub. Con ``--baseline`` compara igual que
+tools.benchmark y termina con código 1 si hay regresiones.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from tools.airtable_stub import make_server as make_stub_server
+from tools.benchmark import make_dataset, regressions
+from utils.settings import CACHE_DIR
+
+DEFAULT_SESSIONS = (1, 10, 50)
+DEFAULT_BASELINE = os.path.join(CACHE_DIR, "loadtest_baseline.json")
+SCRIPT = "portfolio.py"
+TABS = ("skills", "projects", "education", "stem", "contact")
+# Claves (key=) de los widgets que se manejan desde la prueba
+CONTACT_FIELDS = {"contact_name": "Load Test", "contact_email": "load@example.com",
+                  "contact_phone": "", "contact_notes": "Mensaje de prueba de carga"}
+# Botón Send del st.form "contact_form" (Streamlit le da esta clave)
+CONTACT_SUBMIT = "FormSubmitter:contact_form-Send"
+# Métricas que se comparan con la línea base (el RSS absoluto depende de la máquina)
+COMPARABLE = ("p50_seconds", "p95_seconds", "p99_seconds", "errors",
+              "bytes_per_session", "rss_growth_bytes")
+# Tamaño máximo de un mensaje websocket (el HTML de una sección puede ser grande)
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+
+# ========== SERVIDOR ==========
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_bytes(pid):
+    """RSS actual de un proceso (Linux, /proc); None si no se puede leer"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+class AppServer:
+    """``streamlit run portfolio.py`` en un proceso hijo con el stub de Airtable"""
+
+    def __init__(self, workdir, env_overrides, timeout=60.0):
+        self.port = free_port()
+        self.stub = make_stub_server()
+        threading.Thread(target=self.stub.serve_forever, name="airtable-stub",
+                         daemon=True).start()
+        secrets = os.path.join(workdir, "secrets.toml")
+        with open(secrets, "w", encoding="utf-8") as f:
+            f.write('AIRTABLE_API_KEY = "loadtest"\n')
+        env = {**os.environ, **env_overrides,
+               "AIRTABLE_ENDPOINT_URL": f"http://127.0.0.1:{self.stub.server_address[1]}"}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", SCRIPT,
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false",
+             "--secrets.files", secrets],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._wait_healthy(timeout)
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def _wait_healthy(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Streamlit terminó con código {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(
+                        f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError("Streamlit no respondió a tiempo")
+
+    def rss(self):
+        return rss_bytes(self.process.pid)
+
+    def delivered(self):
+        """Registros que recibió el stub de Airtable"""
+        with self.stub.state.lock:
+            return len(self.stub.state.records)
+
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.stub.shutdown()
+        self.stub.server_close()
+
+
+class RssSampler:
+    """Muestrea el RSS del servidor en segundo plano y guarda el máximo"""
+
+    def __init__(self, server, interval=0.1):
+        self.server = server
+        self.interval = interval
+        self.peak = server.rss() or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.server.rss() or 0)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+
+# ========== CLIENTE ==========
+
+
+class Session:
+    """Una sesión del navegador: websocket, widgets vistos y métricas"""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.ws = None
+        self.page_script_hash = ""
+        # key del widget -> (id, fragment_id)
+        self.widgets = {}
+        self.bytes = 0
+        self.latencies = []  # (acción, segundos)
+        self.first_deltas = []  # (acción, segundos hasta el primer delta)
+        self.errors = []
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"],
+                                          max_message_size=MAX_MESSAGE_BYTES)
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    def _see(self, msg):
+        if msg.HasField("new_session"):
+            self.page_script_hash = msg.new_session.page_script_hash
+        if not msg.HasField("delta") or not msg.delta.HasField("new_element"):
+            return
+        element = msg.delta.new_element
+        kind = element.WhichOneof("type")
+        widget = getattr(element, kind, None)
+        widget_id = getattr(widget, "id", "")
+        if widget_id.startswith("$$ID-"):
+            # Widgets con key=: el id termina en "-<key>"
+            key = widget_id.split("-", 2)[2]
+            self.widgets[key] = (widget_id, msg.delta.fragment_id)
+
+    async def rerun(self, action, query_string="", widget_states=(), fragment_id=""):
+        """Envía un rerun y espera al script_finished; devuelve False si falló"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back = BackMsg()
+        state = back.rerun_script
+        state.query_string = query_string
+        state.page_script_hash = self.page_script_hash
+        state.fragment_id = fragment_id
+        state.widget_states.widgets.extend(widget_states)
+
+        start = time.perf_counter()
+        first_delta = True
+        await self.ws.write_message(back.SerializeToString(), binary=True)
+        while True:
+            try:
+                data = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+            except asyncio.TimeoutError:
+                self.errors.append(f"{action}: timeout")
+                return False
+            if data is None:
+                self.errors.append(f"{action}: conexión cerrada")
+                return False
+            self.bytes += len(data)
+            msg = ForwardMsg.FromString(data)
+            if first_delta and msg.HasField("delta"):
+                first_delta = False
+                self.first_deltas.append((action, time.perf_counter() - start))
+            self._see(msg)
+            if msg.HasField("delta") and msg.delta.new_element.WhichOneof("type") == "exception":
+                self.errors.append(f"{action}: {msg.delta.new_element.exception.message}")
+            if msg.WhichOneof("type") == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                self.latencies.append((action, time.perf_counter() - start))
+                return msg.script_finished != ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+
+    def widget_state(self, key, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        return WidgetState(id=self.widgets[key][0], **value)
+
+    async def visit(self, lazy_tabs, think):
+        """Un recorrido completo: carga, tabs, paginación y formulario"""
+        query = "tab=skills" if lazy_tabs else ""
+        if not await self.rerun("load", query):
+            return
+        for tab in TABS:
+            await asyncio.sleep(think)
+            await self.rerun(f"tab:{tab}", f"tab={tab}")
+        if "projects_next" in self.widgets:
+            query = "tab=projects" if lazy_tabs else ""
+            await asyncio.sleep(think)
+            if lazy_tabs:
+                await self.rerun("tab:projects", query)
+            await self.rerun("projects_page", query,
+                             [self.widget_state("projects_next", trigger_value=True)],
+                             self.widgets["projects_next"][1])
+
+        if lazy_tabs:
+            await self.rerun("tab:contact", "tab=contact")
+        if any(key not in self.widgets for key in (*CONTACT_FIELDS, CONTACT_SUBMIT)):
+            self.errors.append("contact_submit: formulario no encontrado")
+            return
+        await asyncio.sleep(think)
+        # Como el navegador: los valores del formulario y el trigger del botón
+        states = [self.widget_state(key, string_value=value) for key, value in CONTACT_FIELDS.items()]
+        states.append(self.widget_state(CONTACT_SUBMIT, trigger_value=True))
+        await self.rerun("contact_submit", "tab=contact" if lazy_tabs else "",
+                         states, self.widgets[CONTACT_SUBMIT][1])
+
+
+async def run_session(url, index, args):
+    await asyncio.sleep(args.ramp * index / max(1, args.sessions_now))
+    session = Session(url, args.timeout)
+    try:
+        await session.connect()
+        for _ in range(args.iterations):
+            await session.visit(args.lazy_tabs, args.think)
+    except Exception as e:
+        session.errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        session.close()
+    return session
+
+
+async def run_sessions(url, count, args):
+    args.sessions_now = count
+    return await asyncio.gather(*(run_session(url, i, args) for i in range(count)))
+
+
+# ========== RESULTADOS ==========
+
+
+def percentile(values, q):
+    """Percentil por rango más cercano (q entre 0 y 1)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))]
+
+
+def latency_summary(values):
+    return {"count": len(values), "p50_seconds": percentile(values, 0.50),
+            "p95_seconds": percentile(values, 0.95), "p99_seconds": percentile(values, 0.99)}
+
+
+def run_level(count, args, workdir, env):
+    """Arranca un servidor, lo calienta y mide ``count`` sesiones concurrentes"""
+    server = AppServer(workdir, env)
+    try:
+        url = server.url
+        # Sesión de calentamiento: llena las cachés del proceso y no se mide
+        warm = asyncio.run(run_sessions(url, 1, argparse.Namespace(**{**vars(args), "iterations": 1})))
+        idle_rss = server.rss()
+
+        sampler = RssSampler(server)
+        start = time.perf_counter()
+        sessions = asyncio.run(run_sessions(url, count, args))
+        wall = time.perf_counter() - start
+        peak_rss = sampler.stop()
+        time.sleep(args.settle)
+        final_rss = server.rss()
+        # Lo que recibió el stub, sin el mensaje de la sesión de calentamiento
+        delivered = server.delivered() - sum(
+            action == "contact_submit" for session in warm for action, _ in session.latencies)
+    finally:
+        server.close()
+
+    by_action = {}
+    for session in sessions:
+        for action, seconds in session.latencies:
+            by_action.setdefault(action, []).append(seconds)
+    every = [seconds for values in by_action.values() for seconds in values]
+    errors = [error for session in (*warm, *sessions) for error in session.errors]
+    per_session = [session.bytes for session in sessions]
+    submitted = len(by_action.get("contact_submit", ()))
+
+    result = {"all": {
+        **latency_summary(every),
+        "reruns_per_second": len(every) / wall if wall else 0.0,
+        "errors": len(errors),
+        "bytes_per_session": sum(per_session) / len(per_session),
+        "idle_rss_bytes": idle_rss,
+        "peak_rss_bytes": peak_rss,
+        "rss_growth_bytes": (peak_rss or 0) - (idle_rss or 0),
+        "rss_per_session_bytes": ((peak_rss or 0) - (idle_rss or 0)) / count,
+        "retained_rss_bytes": (final_rss or 0) - (idle_rss or 0),
+        "contact_submitted": submitted,
+        "contact_delivered": delivered,
+    }}
+    for action, values in sorted(by_action.items()):
+        result[action] = latency_summary(values)
+    return result, errors
+
+
+def print_table(results):
+    for count, actions in results.items():
+        summary = actions["all"]
+        print(f"\n== {count} sesiones ==")
+        print(f"{'acción':<20}{'n':>7}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}")
+        for action, values in actions.items():
+            print(f"{action:<20}{values['count']:>7}"
+                  + "".join(f"{values[key]:>10.3f}" if values[key] is not None else f"{'-':>10}"
+                            for key in ("p50_seconds", "p95_seconds", "p99_seconds")))
+        mb = 1024 * 1024
+        print(f"reruns/s {summary['reruns_per_second']:.1f} · errores {summary['errors']} · "
+              f"{summary['bytes_per_session'] / mb:.2f} MB/sesión")
+        print(f"RSS en reposo {(summary['idle_rss_bytes'] or 0) / mb:.0f} MB · pico "
+              f"{(summary['peak_rss_bytes'] or 0) / mb:.0f} MB · "
+              f"{summary['rss_per_session_bytes'] / mb:.2f} MB/sesión · retenido "
+              f"{summary['retained_rss_bytes'] / mb:.0f} MB")
+        print(f"contacto: {summary['contact_submitted']} enviados, "
+              f"{summary['contact_delivered']} recibidos por el stub")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de portfolio.py por websocket")
+    parser.add_argument("--sessions", type=int, nargs="+", default=list(DEFAULT_SESSIONS),
+                        help="niveles de concurrencia (un servidor nuevo por nivel)")
+    parser.add_argument("--iterations", type=int, default=1, help="recorridos por sesión")
+    parser.add_argument("--ramp", type=float, default=1.0,
+                        help="segundos en los que se reparten los inicios de sesión")
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="pausa (segundos) entre acciones de una sesión")
+    parser.add_argument("--rows", type=int,
+                        help="usa CSV sintéticos con estas filas en lugar de Data/")
+    parser.add_argument("--lazy-tabs", action="store_true", help="PORTFOLIO_LAZY_TABS=1")
+    parser.add_argument("--timeout", type=float, default=120.0, help="espera máxima por rerun")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="espera antes de medir el RSS retenido y los envíos al stub")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guarda el resultado como nueva línea base")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="empeoramiento relativo tolerado (0.2 = 20 %%)")
+    parser.add_argument("--min-seconds", type=float, default=0.01,
+                        help="tiempos menores se ignoran al comparar")
+    parser.add_argument("--min-rss-mb", type=float, default=16.0,
+                        help="crecimientos de RSS menores se ignoran al comparar")
+    parser.add_argument("--min-payload-kb", type=float, default=4.0,
+                        help="bytes por sesión menores se ignoran al comparar")
+    parser.add_argument("--json", help="escribe también los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="portfolio-load-") as workdir:
+        env = {"PORTFOLIO_CACHE_DIR": os.path.join(workdir, "cache"),
+               "PORTFOLIO_CONTACT_QUEUE": os.path.join(workdir, "queue.sqlite3"),
+               "PORTFOLIO_LAZY_TABS": "1" if args.lazy_tabs else ""}
+        if args.rows:
+            env["PORTFOLIO_DATA_DIR"] = os.path.join(workdir, "data")
+            make_dataset(env["PORTFOLIO_DATA_DIR"], args.rows)
+        for count in args.sessions:
+            print(f"Ejecutando {count} sesiones concurrentes...", file=sys.stderr)
+            results[str(count)], errors = run_level(count, args, workdir, env)
+            for error in sorted(set(errors))[:10]:
+                print(f"  ⚠️ {error}", file=sys.stderr)
+    print_table(results)
+
+    # Sólo las métricas comparables entre ejecuciones (no los valores absolutos de RSS)
+    comparable = {count: {action: {key: value for key, value in values.items()
+                                   if key in COMPARABLE}
+                          for action, values in actions.items()}
+                  for count, actions in results.items()}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(comparable, f, indent=2)
+        print(f"\nLínea base guardada en {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(comparable, json.load(f), args.threshold, args.min_seconds,
+                                unit="sesiones",
+                                floors={"rss_growth_bytes": args.min_rss_mb * 1024 * 1024,
+                                        "bytes_per_session": args.min_payload_kb * 1024})
+        if found:
+            print(f"\n❌ Regresiones (> {args.threshold:.0%}):")
+            for line in found:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"\n✅ Sin regresiones respecto a {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Perfil del arranque en frío: tiempos de importación y tiempo hasta el primer delta
+
+    python -m tools.profile_startup                   # 3 arranques, mediana
+    python -m tools.profile_startup --runs 5 --top 15 --json startup.json
+    python -m tools.profile_startup --save-baseline   # después: falla si empeora
+
+Dos partes:
+
+  importaciones   ``python -X importtime`` con ``import streamlit`` y los
+                  imports de nivel de módulo de portfolio.py. Lo que importa
+                  streamlit lo paga el proceso al arrancar; el resto, la
+                  primera ejecución del script. Se listan los imports directos
+                  del script y los paquetes más costosos (tiempo propio).
+  arranque        para cada ``--runs`` arranca ``streamlit run portfolio.py``
+                  (con el stub de Airtable y cachés en disco vacías, como un
+                  contenedor nuevo) y mide hasta /_stcore/health, hasta el
+                  primer delta de la primera sesión, hasta su script_finished
+                  y lo mismo para una segunda sesión ya en caliente.
+
+Con ``--baseline`` compara igual que tools.benchmark y termina con código 1
+si hay regresiones.
+"""
+import argparse
+import ast
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from tools.benchmark import regressions
+from tools.loadtest import AppServer, Session
+from utils.settings import CACHE_DIR
+
+SCRIPT = "portfolio.py"
+DEFAULT_BASELINE = os.path.join(CACHE_DIR, "startup_baseline.json")
+
+# "import time: <propio> | <acumulado> | <indentación><módulo>" (microsegundos)
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+# ========== IMPORTACIONES ==========
+
+
+def script_imports(script=SCRIPT):
+    """Sentencias import de nivel de módulo del script (las que paga cada arranque)"""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), script)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def import_times(statements):
+    """(módulo, propio, acumulado, profundidad) por import de un intérprete nuevo"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+                            capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            entries.append((name, int(own) / 1e6, int(cumulative) / 1e6, len(indent) // 2))
+    return entries
+
+
+def import_profile(script=SCRIPT):
+    """Desglose de importaciones: streamlit, imports directos del script y paquetes"""
+    entries = import_times(["import streamlit", *script_imports(script)])
+    # -X importtime lista cada módulo después de sus dependencias: lo que sigue
+    # a la línea de streamlit es lo que añade el script
+    split = next(i for i, (name, _, _, depth) in enumerate(entries)
+                 if name == "streamlit" and depth == 0) + 1
+    script_entries = entries[split:]
+    packages = {}
+    for name, own, _, _ in script_entries:
+        root = name.split(".", 1)[0]
+        packages[root] = packages.get(root, 0.0) + own
+    return {
+        "streamlit_import_seconds": entries[split - 1][2],
+        "script_import_seconds": sum(c for _, _, c, depth in script_entries if depth == 0),
+        "direct": {name: c for name, _, c, depth in script_entries if depth == 0},
+        "packages": packages,
+    }
+
+
+# ========== ARRANQUE ==========
+
+
+async def first_session(url):
+    """Carga la página en una sesión nueva: (segundos al primer delta, a script_finished)"""
+    session = Session(url, timeout=120.0)
+    try:
+        await session.connect()
+        if not await session.rerun("load"):
+            raise RuntimeError(f"La carga falló: {session.errors}")
+    finally:
+        session.close()
+    return session.first_deltas[0][1], session.latencies[0][1]
+
+
+def cold_start(workdir, env):
+    """Un arranque en frío del servidor y dos cargas de página"""
+    start = time.perf_counter()
+    server = AppServer(workdir, env)
+    try:
+        ready = time.perf_counter() - start
+        connect = time.perf_counter()
+        first_delta, first_run = asyncio.run(first_session(server.url))
+        time_to_first_delta = connect - start + first_delta
+        warm_delta, warm_run = asyncio.run(first_session(server.url))
+    finally:
+        server.close()
+    return {
+        "server_ready_seconds": ready,
+        "first_delta_seconds": first_delta,
+        "first_run_seconds": first_run,
+        "time_to_first_delta_seconds": time_to_first_delta,
+        "warm_first_delta_seconds": warm_delta,
+        "warm_run_seconds": warm_run,
+    }
+
+
+# ========== RESULTADOS ==========
+
+
+def median_of(runs):
+    """Mediana de cada clave (también dentro de los diccionarios anidados)"""
+    result = {}
+    for key, value in runs[0].items():
+        if isinstance(value, dict):
+            result[key] = median_of([run[key] for run in runs])
+        else:
+            result[key] = statistics.median(run.get(key, 0.0) for run in runs)
+    return result
+
+
+def print_report(imports, startup, top):
+    print("\n== Importaciones ==")
+    print(f"streamlit (arranque del proceso) {imports['streamlit_import_seconds']:>8.3f} s")
+    print(f"imports de {SCRIPT} (1ª ejecución)  {imports['script_import_seconds']:>8.3f} s")
+    print(f"\n{'import directo':<40}{'acumulado (s)':>14}")
+    for name, seconds in sorted(imports["direct"].items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:<40}{seconds:>14.3f}")
+    print(f"\n{'paquete':<40}{'propio (s)':>14}")
+    for name, seconds in sorted(imports["packages"].items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:<40}{seconds:>14.3f}")
+    print("\n== Arranque (mediana) ==")
+    for key, seconds in startup.items():
+        print(f"{key:<40}{seconds:>14.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil del arranque en frío de portfolio.py")
+    parser.add_argument("--runs", type=int, default=3, help="arranques en frío a medir")
+    parser.add_argument("--top", type=int, default=10, help="filas de cada tabla de imports")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guarda el resultado como nueva línea base")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="empeoramiento relativo tolerado (0.2 = 20 %%)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="tiempos menores se ignoran al comparar")
+    parser.add_argument("--json", help="escribe también los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    # El primer intérprete compila los .pyc; no se mide
+    import_times(script_imports())
+    imports = median_of([import_profile() for _ in range(args.runs)])
+    runs = []
+    for i in range(args.runs):
+        print(f"Arranque en frío {i + 1}/{args.runs}...", file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix="portfolio-startup-") as workdir:
+            env = {"PORTFOLIO_CACHE_DIR": os.path.join(workdir, "cache"),
+                   "PORTFOLIO_CONTACT_QUEUE": os.path.join(workdir, "queue.sqlite3")}
+            runs.append(cold_start(workdir, env))
+    startup = median_of(runs)
+    print_report(imports, startup, args.top)
+
+    results = {"arranque": {"mediana": {
+        "streamlit_import_seconds": imports["streamlit_import_seconds"],
+        "script_import_seconds": imports["script_import_seconds"],
+        **startup,
+    }}}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({**results, "imports": imports}, f, indent=2)
+
+    status = 0
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nLínea base guardada en {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(results, json.load(f), args.threshold, args.min_seconds,
+                                unit="en frío")
+        if found:
+            print(f"\n❌ Regresiones (> {args.threshold:.0%}):")
+            for line in found:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"\n✅ Sin regresiones respecto a {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Arranca Streamlit con las cachés precalentadas y un endpoint de readiness
+
+    python -m tools.serve --ready-port 8502 -- --server.port 8501
+
+Todo lo que va después de ``--`` se pasa a ``streamlit run portfolio.py``.
+En el mismo proceso (las cachés son las del proceso) se lanzan:
+
+  * utils.warmup.warm_up: tablas, registros, índices y fragmentos con imágenes
+  * un servidor HTTP en ``--ready-port`` con
+      GET /readyz   200 cuando el precalentamiento terminó y Streamlit responde
+                    en /_stcore/health; 503 mientras tanto. El cuerpo JSON
+                    incluye el desglose de tiempos por fase
+      GET /livez    200 mientras el proceso esté vivo
+      GET /metrics  métricas de utils.metrics en formato Prometheus
+
+El /_stcore/health de Streamlit responde en cuanto el servidor escucha, con
+las cachés vacías; el orquestador (readinessProbe de Kubernetes, health check
+del balanceador) debe consultar /readyz para no enviar tráfico antes de tiempo.
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils import metrics
+from utils.settings import DEFAULT_TENANT_NAME
+from utils.tenants import DEFAULT_TENANT, get_tenant, multi_tenant, watched_dirs
+from utils.warmup import is_ready, warm_up, warmup_status
+from utils.watcher import start_watcher
+
+SCRIPT = "portfolio.py"
+
+logger = logging.getLogger(__name__)
+
+
+def streamlit_healthy(timeout=1.0):
+    """True si el servidor de Streamlit de este proceso ya responde"""
+    from streamlit import config, runtime
+
+    if not runtime.exists():
+        # Antes de crear el runtime la configuración (puerto) aún no está cargada
+        return False
+    base = config.get_option("server.baseUrlPath").strip("/")
+    path = f"/{base}/_stcore/health" if base else "/_stcore/health"
+    url = f"http://127.0.0.1:{config.get_option('server.port')}{path}"
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+class ProbeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _reply(self, status, body, content_type="application/json"):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/livez":
+            return self._reply(200, json.dumps({"status": "alive"}))
+        if path == "/readyz":
+            status = warmup_status()
+            status["streamlit"] = self.server.check_streamlit()
+            ready = is_ready() and status["streamlit"]
+            return self._reply(200 if ready else 503, json.dumps(status))
+        if path == "/metrics":
+            return self._reply(200, metrics.to_prometheus(),
+                               "text/plain; version=0.0.4; charset=utf-8")
+        self._reply(404, json.dumps({"error": "NOT_FOUND"}))
+
+
+def make_probe_server(host="0.0.0.0", port=8502, check_streamlit=streamlit_healthy):
+    """Servidor de readiness/liveness (puerto 0 = libre)"""
+    server = ThreadingHTTPServer((host, port), ProbeHandler)
+    server.daemon_threads = True
+    server.check_streamlit = check_streamlit
+    return server
+
+
+def warmup_tenants(names):
+    """Tenants a precalentar: los indicados, o el de por defecto"""
+    if not multi_tenant():
+        return [DEFAULT_TENANT]
+    names = names or ([DEFAULT_TENANT_NAME] if DEFAULT_TENANT_NAME else [])
+    tenants = []
+    for name in names:
+        tenant = get_tenant(name)
+        if tenant is None:
+            raise SystemExit(f"Tenant desconocido: {name}")
+        tenants.append(tenant)
+    return tenants
+
+
+def _warm_up(tenants):
+    status = warm_up(tenants)
+    phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in status["phases"].items())
+    logger.info("Precalentamiento terminado en %.2fs (%s)", status["seconds"], phases)
+    for error in status["errors"]:
+        logger.warning("Precalentamiento: %s", error)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Streamlit con cachés precalentadas y endpoint de readiness",
+        epilog="Los argumentos tras -- se pasan a 'streamlit run'")
+    parser.add_argument("--ready-host", default="0.0.0.0")
+    parser.add_argument("--ready-port", type=int, default=8502)
+    parser.add_argument("--tenant", action="append", default=[],
+                        help="tenant a precalentar (repetible; con PORTFOLIO_TENANTS_DIR)")
+    argv = sys.argv[1:] if argv is None else argv
+    if "--" in argv:
+        split = argv.index("--")
+        argv, streamlit_args = argv[:split], argv[split + 1:]
+    else:
+        streamlit_args = []
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    tenants = warmup_tenants(args.tenant)
+    probe = make_probe_server(args.ready_host, args.ready_port)
+    threading.Thread(target=probe.serve_forever, name="readiness-probe", daemon=True).start()
+    print(f"Readiness en http://{args.ready_host}:{probe.server_address[1]}/readyz")
+
+    # El observador primero: lo precalentado no se revalida con os.stat en cada rerun
+    start_watcher(watched_dirs())
+    threading.Thread(target=_warm_up, args=(tenants,), name="warmup", daemon=True).start()
+
+    from streamlit.web import cli
+
+    cli.main(["run", SCRIPT, *streamlit_args], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    main()
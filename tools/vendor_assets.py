@@ -0,0 +1,288 @@
+"""Vendoriza MaterializeCSS, Font Awesome y Material Icons con sólo lo que usa el portfolio
+
+    python -m tools.vendor_assets                  # descarga desde los CDN
+    python -m tools.vendor_assets --source-dir DIR # usa copias locales (sin red)
+
+Pasos:
+  1. Busca en las plantillas (portfolio.py, utils/, templates/) las clases CSS
+     y los iconos realmente usados.
+  2. Elimina de materialize.min.css y all.min.css las reglas cuyos selectores
+     usan clases que no aparecen en las plantillas.
+  3. Recorta las fuentes de iconos a los glifos referenciados (requiere
+     fontTools, ver requirements-build.txt; sin él se copian completas).
+  4. Escribe las fuentes en static/vendor/ con nombre por hash y el CSS
+     resultante en assets/vendor/vendor.min.css, que utils.styles incrusta en
+     lugar de cargar los <link> de los CDN.
+"""
+import argparse
+import glob
+import hashlib
+import io
+import os
+import re
+import urllib.request
+
+from utils.settings import STATIC_DIR
+from utils.static import STATIC_URL_PREFIX
+from utils.styles import VENDOR_CSS, minify_css
+
+FA_CDN = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.7.2"
+SOURCES = {
+    "materialize.min.css": "https://cdnjs.cloudflare.com/ajax/libs/materialize/1.0.0/css/materialize.min.css",
+    "all.min.css": f"{FA_CDN}/css/all.min.css",
+    "webfonts/fa-brands-400.woff2": f"{FA_CDN}/webfonts/fa-brands-400.woff2",
+    "webfonts/fa-solid-900.woff2": f"{FA_CDN}/webfonts/fa-solid-900.woff2",
+    "MaterialIcons-Regular.ttf": "https://raw.githubusercontent.com/google/material-design-icons/master/font/MaterialIcons-Regular.ttf",
+}
+
+# Archivos donde se buscan clases e iconos usados
+TEMPLATE_GLOBS = ("portfolio.py", "utils/*.py", "templates/*", "tools/export_static.py")
+
+VENDOR_STATIC_SUBDIR = "vendor"
+
+CLASS_ATTR_RE = re.compile(r'class\s*=\s*["\']([^"\']*)["\']')
+MATERIAL_ICON_RE = re.compile(r'<i class\s*=\s*"material-icons[^"]*"[^>]*>\s*([a-z0-9_]+)\s*</i>')
+SELECTOR_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)")
+FONT_URL_RE = re.compile(r"url\(([^)]*?([\w-]+)\.woff2)\)")
+CONTENT_CODEPOINT_RE = re.compile(r'content:\s*"\\([0-9a-fA-F]{4,5})"')
+
+MATERIAL_ICONS_CSS = (
+    "@font-face{font-family:'Material Icons';font-style:normal;font-weight:400;"
+    "font-display:block;src:url(%s) format('woff2')}"
+    ".material-icons{font-family:'Material Icons';font-weight:normal;font-style:normal;"
+    "font-size:24px;line-height:1;letter-spacing:normal;text-transform:none;"
+    "display:inline-block;white-space:nowrap;word-wrap:normal;direction:ltr;"
+    "-webkit-font-feature-settings:'liga';font-feature-settings:'liga';"
+    "-webkit-font-smoothing:antialiased}"
+)
+
+
+def fetch(name, source_dir=None):
+    """Contenido de un recurso: desde la carpeta local o desde su CDN"""
+    if source_dir:
+        with open(os.path.join(source_dir, name), "rb") as f:
+            return f.read()
+    with urllib.request.urlopen(SOURCES[name], timeout=30) as response:
+        return response.read()
+
+
+def used_names(globs=TEMPLATE_GLOBS):
+    """Clases CSS e iconos de Material Icons que aparecen en las plantillas"""
+    classes, icons = set(), set()
+    for pattern in globs:
+        for path in glob.glob(pattern):
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            for value in CLASS_ATTR_RE.findall(text):
+                classes.update(value.split())
+            icons.update(MATERIAL_ICON_RE.findall(text))
+    return classes, icons
+
+
+# ========== PURGA DE CSS ==========
+
+
+def split_top_level(text, sep=","):
+    """Divide por ``sep`` ignorando lo que está entre paréntesis"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == sep and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def iter_statements(css):
+    """Recorre las sentencias de primer nivel: (prelude, cuerpo) o (sentencia, None)"""
+    i, n = 0, len(css)
+    while i < n:
+        brace = css.find("{", i)
+        semicolon = css.find(";", i)
+        if brace == -1 and semicolon == -1:
+            break
+        if semicolon != -1 and (brace == -1 or semicolon < brace):
+            # Sentencias sin bloque: @charset, @import...
+            yield css[i:semicolon + 1].strip(), None
+            i = semicolon + 1
+            continue
+        depth, j = 1, brace + 1
+        while j < n and depth:
+            if css[j] == "{":
+                depth += 1
+            elif css[j] == "}":
+                depth -= 1
+            j += 1
+        yield css[i:brace].strip(), css[brace + 1:j - 1]
+        i = j
+
+
+def selector_is_used(selector, classes):
+    """True si todas las clases del selector aparecen en las plantillas"""
+    # Las clases dentro de :not(...) no restringen el elemento
+    selector = re.sub(r":not\([^)]*\)", "", selector)
+    return all(name in classes for name in SELECTOR_CLASS_RE.findall(selector))
+
+
+def purge_css(css, classes):
+    """Elimina las reglas cuyos selectores usan clases ausentes de las plantillas"""
+    out = []
+    for prelude, body in iter_statements(css):
+        if body is None:
+            # @charset/@import no tienen sentido dentro de un <style> incrustado
+            continue
+        if prelude.startswith(("@media", "@supports")):
+            inner = purge_css(body, classes)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            # @font-face, @keyframes...: se filtran después
+            out.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [s.strip() for s in split_top_level(prelude) if selector_is_used(s, classes)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{body}}}")
+    return "".join(out)
+
+
+def drop_unused_keyframes(css):
+    """Quita @keyframes cuyo nombre no se menciona en el resto del CSS"""
+    def keep(match):
+        name = match.group(2)
+        rest = css[:match.start()] + css[match.end():]
+        return match.group(0) if re.search(rf"\b{re.escape(name)}\b", rest) else ""
+    return re.sub(r"@(-webkit-)?keyframes\s+([\w-]+)\s*\{(?:[^{}]*\{[^{}]*\})*[^{}]*\}", keep, css)
+
+
+# ========== FUENTES ==========
+
+
+def subset_font(data, unicodes=(), glyph_names=(), flavor="woff2"):
+    """Recorta una fuente a los códigos/glifos dados; sin fontTools la devuelve igual"""
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        print("  fontTools no instalado: se copia la fuente completa")
+        return data, False
+
+    font = TTFont(io.BytesIO(data))
+    options = subset.Options()
+    options.flavor = flavor
+    options.layout_features = ["liga", "rlig", "kern"]
+    # Sin cierre de layout: las ligaduras sólo conservan los glifos pedidos
+    options.layout_closure = not glyph_names
+    options.notdef_outline = True
+    subsetter = subset.Subsetter(options)
+    cmap = font.getBestCmap()
+    glyphs = set(glyph_names) | {cmap[u] for u in unicodes if u in cmap}
+    subsetter.populate(unicodes=unicodes, glyphs=glyphs)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font.flavor = flavor
+    font.save(out)
+    return out.getvalue(), True
+
+
+def ligature_glyphs(data, words):
+    """Nombres de los glifos a los que la tabla GSUB convierte cada palabra (ligaduras)"""
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(io.BytesIO(data))
+    chars = {glyph: chr(code) for code, glyph in font.getBestCmap().items()}
+    glyphs = set()
+    for lookup in font["GSUB"].table.LookupList.Lookup:
+        for subtable in lookup.SubTable:
+            for first, ligatures in getattr(subtable, "ligatures", {}).items():
+                for ligature in ligatures:
+                    word = "".join(chars.get(g, "") for g in (first, *ligature.Component))
+                    if word in words:
+                        glyphs.add(ligature.LigGlyph)
+    return glyphs
+
+
+def publish_font(name, data, static_dir=STATIC_DIR):
+    """Guarda la fuente en static/vendor/ con hash en el nombre y devuelve su URL"""
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(name))[0]
+    filename = f"{stem}.{digest}.woff2"
+    target_dir = os.path.join(static_dir, VENDOR_STATIC_SUBDIR)
+    os.makedirs(target_dir, exist_ok=True)
+    for old in glob.glob(os.path.join(target_dir, f"{stem}.*.woff2")):
+        os.remove(old)
+    with open(os.path.join(target_dir, filename), "wb") as f:
+        f.write(data)
+    return f"{STATIC_URL_PREFIX}/{VENDOR_STATIC_SUBDIR}/{filename}?v={digest}"
+
+
+def vendor_font_awesome(source_dir, classes):
+    """CSS de Font Awesome purgado y sus fuentes recortadas a los iconos usados"""
+    css = purge_css(fetch("all.min.css", source_dir).decode("utf-8"), classes)
+    codepoints = sorted({int(cp, 16) for cp in CONTENT_CODEPOINT_RE.findall(css)})
+
+    urls = {}
+
+    def replace_font_face(match):
+        block = match.group(0)
+        font_url = FONT_URL_RE.search(block)
+        name = f"webfonts/{font_url.group(2)}.woff2" if font_url else None
+        # Sólo las familias de la v6 con brands/solid; regular y los alias v4/v5 no se usan
+        if name not in SOURCES or 'font-family:"Font Awesome 6' not in block:
+            return ""
+        if name not in urls:
+            data, subset_done = subset_font(fetch(name, source_dir), unicodes=codepoints)
+            print(f"  {name}: {len(data)} bytes" + (" (recortada)" if subset_done else ""))
+            urls[name] = publish_font(name, data)
+        return re.sub(r"src:[^;}]*", f'src:url({urls[name]}) format("woff2")', block)
+
+    return re.sub(r"@font-face\{[^}]*\}", replace_font_face, css)
+
+
+def vendor_material_icons(source_dir, icons):
+    """@font-face y clase .material-icons con la fuente reducida a los iconos usados"""
+    if not icons:
+        return ""
+    data = fetch("MaterialIcons-Regular.ttf", source_dir)
+    # Las letras de cada nombre más el glifo al que se convierten por ligadura
+    letters = sorted({ord(c) for c in "".join(icons)})
+    try:
+        glyph_names = ligature_glyphs(data, set(icons))
+    except ImportError:
+        glyph_names = ()
+    data, subset_done = subset_font(data, unicodes=letters, glyph_names=sorted(glyph_names))
+    print(f"  MaterialIcons-Regular: {len(data)} bytes" + (" (recortada)" if subset_done else ""))
+    return MATERIAL_ICONS_CSS % publish_font("MaterialIcons-Regular", data)
+
+
+def build(source_dir=None, output=VENDOR_CSS):
+    """Genera assets/vendor/vendor.min.css y las fuentes en static/vendor/"""
+    classes, icons = used_names()
+    print(f"{len(classes)} clases y {len(icons)} iconos de Material Icons usados: {sorted(icons)}")
+
+    materialize = fetch("materialize.min.css", source_dir).decode("utf-8")
+    materialize = drop_unused_keyframes(purge_css(materialize, classes))
+    print(f"  materialize: {len(materialize)} bytes tras la purga")
+
+    css = minify_css(materialize + vendor_font_awesome(source_dir, classes)
+                     + vendor_material_icons(source_dir, icons))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(css)
+    print(f"{output}: {len(css)} bytes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vendoriza y recorta CSS y fuentes de iconos")
+    parser.add_argument("--source-dir", help="carpeta con copias locales de los recursos de SOURCES")
+    args = parser.parse_args(argv)
+    build(args.source_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Utilidades compartidas por portfolio.py (caché, imágenes y configuración)"""
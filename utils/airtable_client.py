@@ -0,0 +1,89 @@
+"""Cliente de Airtable compartido por el proceso, con pool de conexiones y métricas"""
+import threading
+import time
+
+import requests
+from pyairtable import Api
+from requests.adapters import HTTPAdapter
+
+from utils import metrics
+from utils.settings import (AIRTABLE_CONNECT_TIMEOUT, AIRTABLE_ENDPOINT_URL,
+                            AIRTABLE_POOL_SIZE, AIRTABLE_READ_TIMEOUT)
+
+request_latency = metrics.histogram(
+    "airtable_request_seconds", "Latencia de las peticiones HTTP a Airtable")
+request_errors = metrics.counter(
+    "airtable_request_errors_total", "Peticiones a Airtable fallidas (red o HTTP >= 400)")
+
+
+class InstrumentedSession(requests.Session):
+    """Session de requests que mide la latencia y cuenta errores de cada petición
+
+    pyairtable llama a ``session.request`` sin timeout: lo pone la sesión,
+    ``(conexión, lectura)``, para que un servidor que no responde no bloquee
+    al worker de contacto.
+    """
+
+    def __init__(self, timeout=(AIRTABLE_CONNECT_TIMEOUT, AIRTABLE_READ_TIMEOUT)):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            response = super().request(*args, **kwargs)
+        except requests.RequestException:
+            request_errors.inc()
+            raise
+        finally:
+            request_latency.observe(time.perf_counter() - start)
+        if response.status_code >= 400:
+            request_errors.inc()
+        return response
+
+
+class AirtableClient:
+    """Un único Api de pyairtable con keep-alive y pool de conexiones reutilizables"""
+
+    def __init__(self, api_key, endpoint_url=AIRTABLE_ENDPOINT_URL,
+                 pool_size=AIRTABLE_POOL_SIZE,
+                 timeout=(AIRTABLE_CONNECT_TIMEOUT, AIRTABLE_READ_TIMEOUT)):
+        # Los reintentos los gestiona la cola de contacto (tenacity)
+        self.api = Api(api_key, retry_strategy=False, endpoint_url=endpoint_url)
+        session = InstrumentedSession(timeout)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self.api.session = session
+        # Reasignar la key vuelve a poner la cabecera Authorization en la nueva sesión
+        self.api.api_key = api_key
+
+    def table(self, base_id, table_name):
+        """Tabla de Airtable que comparte la sesión del cliente"""
+        return self.api.table(base_id, table_name)
+
+    def health_check(self):
+        """Comprueba conectividad y credenciales con /v0/meta/whoami"""
+        start = time.perf_counter()
+        try:
+            self.api.whoami()
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e)
+        return {"ok": ok, "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                "error": error}
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_airtable_client(api_key, endpoint_url=AIRTABLE_ENDPOINT_URL):
+    """Cliente único por (api key, endpoint) para todo el proceso"""
+    key = (api_key, endpoint_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = AirtableClient(api_key, endpoint_url)
+        return client
@@ -0,0 +1,167 @@
+"""Caché LRU acotada en bytes y single-flight, compartidas entre sesiones de Streamlit"""
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class LRUCache:
+    """LRU thread-safe con límite de bytes y contadores de aciertos/fallos
+
+    ``generation`` aumenta con cada ``discard``/``clear``: quien construye un
+    valor la lee antes de empezar y la pasa a ``put``, que no lo guarda si
+    entretanto hubo una invalidación (el valor puede venir de archivos viejos).
+    """
+
+    def __init__(self, max_bytes, sizeof=len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self._bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Devuelve el valor y lo marca como usado recientemente"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, generation=None):
+        """Guarda un valor y expulsa los más antiguos si se supera el límite
+
+        Con ``generation`` (la de antes de construir el valor) no se guarda
+        si desde entonces se descartaron entradas.
+        """
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            # Un valor más grande que todo el presupuesto no se guarda
+            return value
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return value
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, old_size) = self._data.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+        return value
+
+    def discard(self, predicate):
+        """Elimina las entradas para las que predicate(clave, valor) es verdadero"""
+        with self._lock:
+            self.generation += 1
+            for key in [k for k, (v, _) in self._data.items() if predicate(k, v)]:
+                self._bytes -= self._data.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Resumen de uso de la caché"""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Tamaño aproximado de una entrada de metadatos (clave con la ruta y tupla)
+SMALL_ENTRY_BYTES = 256
+
+
+def small_entry_bytes(value):
+    """sizeof de las cachés de metadatos por archivo: hashes, URLs..."""
+    return SMALL_ENTRY_BYTES + len(value)
+
+
+class DerivedCache:
+    """Valores calculados a partir de un objeto, que se liberan junto con él
+
+    Sirve para objetos no hashables como los DataFrame: la clave es
+    ``id(obj)`` y un ``weakref.finalize`` borra sus entradas cuando el objeto
+    se recolecta. Así lo derivado (registros, índices) ocupa memoria sólo
+    mientras la tabla siga en su LRU o en uso por alguna sesión.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, obj, name, build):
+        """Valor ``name`` de ``obj``; se calcula con ``build()`` la primera vez"""
+        key = (id(obj), name)
+        value = self._data.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = build()
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = value
+                weakref.finalize(obj, self._data.pop, key, None)
+            return self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+
+_MISSING = object()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave en una única ejecución
+
+    Si varias sesiones piden a la vez la misma tabla o fragmento, sólo una
+    lo reconstruye y las demás esperan su resultado (evita la estampida).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,300 @@
+"""Cola persistente y worker en segundo plano para los mensajes de contacto
+
+El formulario sólo inserta el mensaje en una cola SQLite y responde al
+instante. Un único worker por proceso envía los pendientes a Airtable en
+lotes (``table.batch_create``, hasta 10 registros por petición) reutilizando
+el mismo cliente, con reintentos y backoff exponencial vía tenacity. Cada
+mensaje guarda la base de Airtable de su portfolio (tenant) y los lotes se
+forman con mensajes de la misma base.
+
+requests y tenacity se importan al enviar: comprobar la cola al arrancar
+(``resume_pending``) o encolar no los cargan.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from utils import metrics
+from utils.settings import AIRTABLE_BASE_ID, CONTACT_QUEUE_PATH
+
+logger = logging.getLogger(__name__)
+
+contacts_enqueued = metrics.counter("contact_enqueued_total", "Mensajes de contacto encolados")
+contacts_sent = metrics.counter("contact_sent_total", "Mensajes de contacto enviados a Airtable")
+contacts_failed = metrics.counter(
+    "contact_failed_total", "Mensajes de contacto marcados como fallidos")
+
+QUEUED = "queued"
+SENT = "sent"
+FAILED = "failed"
+
+# Registros por petición (límite de la API de Airtable)
+BATCH_SIZE = 10
+# Intentos totales (entre ciclos del worker) antes de marcar un mensaje como fallido
+MAX_ATTEMPTS = 8
+# Espera máxima entre revisiones de la cola cuando no hay avisos
+POLL_SECONDS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fields TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    record_id TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    base_id TEXT
+);
+CREATE INDEX IF NOT EXISTS submissions_status ON submissions (status, id);
+"""
+
+
+def is_retryable(error):
+    """Errores transitorios: red, timeouts, 429 y 5xx"""
+    import requests
+
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+
+class ContactQueue:
+    """Cola SQLite de mensajes con un worker que los envía a Airtable por lotes"""
+
+    def __init__(self, path=CONTACT_QUEUE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._make_table = None
+        self._tables = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(submissions)")}
+            if "base_id" not in columns:
+                # Colas creadas antes de los tenants: sus mensajes van a la base por defecto
+                db.execute("ALTER TABLE submissions ADD COLUMN base_id TEXT")
+
+    def _connect(self):
+        # Una conexión por hilo; WAL permite leer estados mientras el worker escribe
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def enqueue(self, fields, base_id=None):
+        """Guarda un mensaje en la cola y despierta al worker; devuelve su id
+
+        ``base_id`` es la base de Airtable del tenant (None = la de por defecto).
+        """
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO submissions (fields, created_at, base_id) VALUES (?, ?, ?)",
+                (json.dumps(fields), time.time(), base_id))
+        contacts_enqueued.inc()
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def status(self, submission_id):
+        """Estado de un mensaje: 'queued', 'sent', 'failed' o None si no existe"""
+        row = self._connect().execute(
+            "SELECT status FROM submissions WHERE id = ?", (submission_id,)).fetchone()
+        return row[0] if row else None
+
+    def pending(self, limit=BATCH_SIZE):
+        """Base del mensaje en cola más antiguo y los pendientes de esa base
+
+        Devuelve (base_id, lista de (id, fields, attempts)).
+        """
+        db = self._connect()
+        oldest = db.execute(
+            "SELECT base_id FROM submissions WHERE status = ? ORDER BY id LIMIT 1",
+            (QUEUED,)).fetchone()
+        if oldest is None:
+            return None, []
+        rows = db.execute(
+            "SELECT id, fields, attempts FROM submissions WHERE status = ? AND base_id IS ? "
+            "ORDER BY id LIMIT ?", (QUEUED, oldest[0], limit)).fetchall()
+        return oldest[0], [(row_id, json.loads(fields), attempts)
+                           for row_id, fields, attempts in rows]
+
+    def _table_for(self, base_id):
+        # Una tabla por base, todas sobre el mismo cliente HTTP
+        with self._lock:
+            table = self._tables.get(base_id)
+            if table is None:
+                table = self._tables[base_id] = self._make_table(base_id)
+            return table
+
+    def start(self, make_table):
+        """Arranca el worker (una sola vez) y fija cómo se crean las tablas
+
+        ``make_table(base_id)`` crea la tabla de Airtable de una base; recibe
+        None para los mensajes sin base (la de por defecto). Cada llamada
+        sustituye al anterior: si cambia (p. ej. se rotó la API key) las
+        tablas ya creadas se descartan y los siguientes lotes usan la nueva.
+        """
+        with self._lock:
+            if make_table is not self._make_table:
+                self._make_table = make_table
+                self._tables = {}
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="contact-queue", daemon=True)
+                self._worker.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(POLL_SECONDS)
+            self._wakeup.clear()
+            try:
+                while self.flush_once():
+                    pass
+            except Exception as e:
+                logger.exception("Error en el worker de contacto: %s", e)
+
+    def flush_once(self):
+        """Envía un lote de pendientes; devuelve True si quedan más por enviar"""
+        base_id, batch = self.pending()
+        if not batch or self._make_table is None:
+            return False
+        table = self._table_for(base_id)
+        try:
+            self._mark_sent(batch, self._send(table, [fields for _, fields, _ in batch]))
+        except Exception as e:
+            if is_retryable(e) or len(batch) == 1:
+                self._record_failure(batch, e)
+                return False
+            # Airtable rechaza el lote entero si un registro es inválido:
+            # los enviamos de uno en uno para aislar al culpable
+            for item in batch:
+                try:
+                    self._mark_sent([item], self._send(table, [item[1]]))
+                except Exception as item_error:
+                    self._record_failure([item], item_error)
+        return len(batch) == BATCH_SIZE
+
+    def _mark_sent(self, batch, created):
+        with self._connect() as db:
+            db.executemany(
+                "UPDATE submissions SET status = ?, record_id = ?, sent_at = ?, last_error = NULL WHERE id = ?",
+                [(SENT, record.get("id"), time.time(), row_id)
+                 for (row_id, _, _), record in zip(batch, created)])
+        contacts_sent.inc(len(batch))
+
+    # El span incluye los reintentos: es lo que tarda en salir un lote
+    @metrics.span("contact_batch_send", "Envío de un lote a Airtable, con reintentos")
+    def _send(self, table, records):
+        from tenacity import (Retrying, retry_if_exception, stop_after_attempt,
+                              wait_exponential)
+
+        retrying = Retrying(retry=retry_if_exception(is_retryable), stop=stop_after_attempt(4),
+                            wait=wait_exponential(multiplier=0.5, max=8), reraise=True)
+        return retrying(table.batch_create, records)
+
+    def _record_failure(self, batch, error):
+        # Los errores transitorios se reintentan en el siguiente ciclo del worker;
+        # los definitivos (p. ej. 4xx por datos inválidos) se marcan como fallidos
+        logger.warning("Fallo enviando %d mensajes a Airtable: %s", len(batch), error)
+        with self._connect() as db:
+            for row_id, _, attempts in batch:
+                attempts += 1
+                failed = not is_retryable(error) or attempts >= MAX_ATTEMPTS
+                if failed:
+                    contacts_failed.inc()
+                db.execute(
+                    "UPDATE submissions SET status = ?, attempts = ?, last_error = ? WHERE id = ?",
+                    (FAILED if failed else QUEUED, attempts, str(error), row_id))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_contact_queue():
+    """Cola de contacto única por proceso"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = ContactQueue()
+        return _queue
+
+
+def has_pending(path=CONTACT_QUEUE_PATH):
+    """True si la cola tiene mensajes sin enviar (no la crea ni arranca nada)"""
+    if not os.path.exists(path):
+        return False
+    try:
+        db = sqlite3.connect(path, timeout=10)
+        try:
+            return db.execute("SELECT 1 FROM submissions WHERE status = ? LIMIT 1",
+                              (QUEUED,)).fetchone() is not None
+        finally:
+            db.close()
+    except sqlite3.Error as e:
+        logger.warning("No se pudo revisar la cola de contacto %s: %s", path, e)
+        return False
+
+
+_resume_checked = False
+
+
+def resume_pending(get_api_key):
+    """Arranca el worker si quedaron mensajes de una ejecución anterior (una vez por proceso)
+
+    Tras un reinicio o una caída los mensajes en cola no esperan a que
+    alguien envíe otro. ``get_api_key()`` sólo se llama si hay pendientes;
+    devuelve True si el worker arrancó.
+    """
+    global _resume_checked
+    with _queue_lock:
+        if _resume_checked:
+            return False
+        _resume_checked = True
+    if not has_pending():
+        return False
+    api_key = get_api_key()
+    if not api_key:
+        logger.warning("Hay mensajes de contacto en cola pero no hay API key de Airtable")
+        return False
+    get_contact_queue().start(airtable_tables(api_key))
+    return True
+
+
+# make_table por (api key, base por defecto)
+_table_factories = {}
+
+
+def airtable_tables(api_key, default_base_id=AIRTABLE_BASE_ID):
+    """``make_table(base_id)`` para ContactQueue.start (None = la base por defecto)
+
+    Es la misma función para la misma key y base, así ``start`` sólo
+    descarta las tablas creadas cuando la key cambia.
+    """
+    key = (api_key, default_base_id)
+    with _queue_lock:
+        make_table = _table_factories.get(key)
+        if make_table is None:
+            make_table = _table_factories[key] = (
+                lambda base_id: airtable_table(api_key, base_id or default_base_id))
+        return make_table
+
+
+def airtable_table(api_key, base_id, table_name="contacts"):
+    """Tabla de Airtable sobre el cliente compartido del proceso"""
+    # pyairtable (con pydantic) se importa al crear la primera tabla, no con la cola
+    from utils.airtable_client import get_airtable_client
+
+    return get_airtable_client(api_key).table(base_id, table_name)
@@ -0,0 +1,192 @@
+"""Lectura de las tablas de contenido: paquete Arrow compilado con respaldo en CSV
+
+Los CSV de la carpeta Data siguen siendo el formato de edición. El comando
+
+    python -m utils.data build
+
+los compila a archivos Arrow IPC (Data/.bundle/) junto con un manifest de
+hashes; al arrancar se leen por memory-map sin parsear CSV. Si un CSV cambió
+después de compilar, se usa el CSV directamente.
+
+``load_table`` mantiene cada tabla en memoria del proceso hasta que el
+observador de archivos avisa de un cambio en Data/. Las tablas de todos los
+tenants comparten una LRU con presupuesto en bytes (PORTFOLIO_TABLE_CACHE_MB).
+
+Todas las sesiones reciben el mismo objeto DataFrame, sin copias: es de sólo
+lectura. Quien necesite modificarlo debe hacer ``df.copy()`` antes.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from utils import metrics
+from utils.cache import LRUCache, SingleFlight
+from utils.images import file_key
+from utils.settings import DATA_DIR, TABLE_CACHE_MB
+from utils.watcher import is_watching, on_file_change
+
+BUNDLE_DIR = os.path.join(DATA_DIR, ".bundle")
+MANIFEST = "manifest.json"
+BUNDLE_FORMAT = 1
+
+logger = logging.getLogger(__name__)
+
+load_latency = metrics.histogram(
+    "table_load_seconds", "Lectura de una tabla desde el paquete Arrow o el CSV")
+
+
+def table_path(table_name, data_dir=DATA_DIR):
+    """Ruta del CSV de una tabla"""
+    return f"{data_dir}/{table_name}.csv"
+
+
+def bundle_dir_for(data_dir):
+    """Carpeta del paquete Arrow compilado de una carpeta de datos"""
+    return os.path.join(data_dir, ".bundle")
+
+
+def file_sha256(path):
+    """sha256 del contenido de un archivo"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_manifest(bundle_dir=BUNDLE_DIR):
+    """Manifest del paquete compilado; vacío si no existe o es de otro formato"""
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("format") != BUNDLE_FORMAT:
+        return {}
+    return manifest.get("tables", {})
+
+
+def bundle_entry_is_fresh(entry, csv_path):
+    """True si el CSV no cambió desde que se compiló la entrada del manifest"""
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        # Sin CSV (p. ej. despliegue sólo con el paquete) usamos lo compilado
+        return True
+    if stat.st_size != entry["csv_size"]:
+        return False
+    if stat.st_mtime_ns == entry["csv_mtime_ns"]:
+        return True
+    # Mismo tamaño pero otro mtime (checkout, copia): comparamos el contenido
+    return file_sha256(csv_path) == entry["csv_sha256"]
+
+
+def read_bundle_table(path):
+    """Lee un archivo Arrow IPC por memory-map (sin copiar los buffers)"""
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def read_table(table_name, data_dir=DATA_DIR):
+    """DataFrame de una tabla: desde el paquete Arrow si está al día, si no desde el CSV"""
+    csv_path = table_path(table_name, data_dir)
+    bundle_dir = bundle_dir_for(data_dir)
+    entry = read_manifest(bundle_dir).get(table_name)
+    if entry is not None and bundle_entry_is_fresh(entry, csv_path):
+        try:
+            return read_bundle_table(os.path.join(bundle_dir, entry["file"])).to_pandas()
+        except (OSError, pa.ArrowException) as e:
+            logger.warning("Paquete Arrow ilegible para %s, usando CSV: %s", table_name, e)
+    return pd.read_csv(csv_path)
+
+
+def table_bytes(entry):
+    """Memoria ocupada por el DataFrame de una entrada de la caché de tablas"""
+    return int(entry[1].memory_usage(index=True, deep=True).sum())
+
+
+# Tablas cargadas: (carpeta absoluta, nombre) -> (clave del CSV al cargar, DataFrame)
+table_cache = LRUCache(TABLE_CACHE_MB * 1024 * 1024, sizeof=table_bytes)
+_table_loads = SingleFlight()
+metrics.register_cache("table", table_cache)
+
+
+def _load_table(table_name, data_dir):
+    # Si el observador invalida la tabla mientras se lee, no se guarda lo leído
+    generation = table_cache.generation
+    key = file_key(table_path(table_name, data_dir))
+    with load_latency.time():
+        df = read_table(table_name, data_dir)
+    table_cache.put((os.path.abspath(data_dir), table_name), (key, df), generation)
+    return df
+
+
+def load_table(table_name, data_dir=DATA_DIR):
+    """Tabla cacheada en el proceso (compartida, no modificar); una sola sesión la recarga tras un cambio"""
+    cache_key = (os.path.abspath(data_dir), table_name)
+    entry = table_cache.get(cache_key)
+    if entry is not None and (is_watching()
+                              or entry[0] == file_key(table_path(table_name, data_dir))):
+        return entry[1]
+    return _table_loads.do(cache_key, lambda: _load_table(table_name, data_dir))
+
+
+@on_file_change
+def invalidate_table(path):
+    """Descarta la tabla cuyo CSV cambió (o las de su carpeta si cambió el paquete Arrow)"""
+    parent = os.path.dirname(path)
+    if path.endswith(".csv"):
+        table_name = os.path.splitext(os.path.basename(path))[0]
+        table_cache.discard(lambda key, _: key == (parent, table_name))
+    elif os.path.basename(parent) == ".bundle":
+        data_dir = os.path.dirname(parent)
+        table_cache.discard(lambda key, _: key[0] == data_dir)
+
+
+def build_bundle(data_dir=DATA_DIR, bundle_dir=BUNDLE_DIR):
+    """Compila todos los CSV de ``data_dir`` a Arrow IPC y escribe el manifest"""
+    os.makedirs(bundle_dir, exist_ok=True)
+    tables = {}
+    for csv_path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        table_name = os.path.splitext(os.path.basename(csv_path))[0]
+        stat = os.stat(csv_path)
+        table = pa.Table.from_pandas(pd.read_csv(csv_path), preserve_index=False)
+
+        # Sin compresión para poder leerlo con memory-map sin copias
+        filename = f"{table_name}.arrow"
+        tmp_path = os.path.join(bundle_dir, f"{filename}.tmp")
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, os.path.join(bundle_dir, filename))
+
+        tables[table_name] = {
+            "file": filename,
+            "rows": table.num_rows,
+            "csv_sha256": file_sha256(csv_path),
+            "csv_size": stat.st_size,
+            "csv_mtime_ns": stat.st_mtime_ns,
+        }
+
+    tmp_manifest = os.path.join(bundle_dir, f"{MANIFEST}.tmp")
+    with open(tmp_manifest, "w", encoding="utf-8") as f:
+        json.dump({"format": BUNDLE_FORMAT, "tables": tables}, f, indent=2)
+    os.replace(tmp_manifest, os.path.join(bundle_dir, MANIFEST))
+    return tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila los CSV de Data a un paquete Arrow")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+    bundle_dir = bundle_dir_for(args.data_dir)
+    for table_name, entry in build_bundle(args.data_dir, bundle_dir).items():
+        print(f"{table_name}: {entry['rows']} filas -> {bundle_dir}/{entry['file']}")
+
+
+if __name__ == "__main__":
+    main()
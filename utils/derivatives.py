@@ -0,0 +1,168 @@
+"""Variantes redimensionadas (WebP/JPEG) de las imágenes con caché en disco"""
+import hashlib
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from PIL import Image, features
+
+from utils import metrics
+from utils.cache import SMALL_ENTRY_BYTES, LRUCache, small_entry_bytes
+from utils.images import encode_image, file_key
+from utils.settings import CACHE_DIR, DERIVATIVE_WIDTHS, HASH_CACHE_MB, IMAGE_MODE
+from utils.static import publish_static
+
+logger = logging.getLogger(__name__)
+
+resize_latency = metrics.histogram(
+    "image_resize_seconds", "Apertura de una imagen y generación de las variantes que faltan en disco")
+
+DERIVATIVE_DIR = os.path.join(CACHE_DIR, "derivatives")
+
+# Si Pillow no trae soporte WebP generamos JPEG progresivo
+FORMAT = "webp" if features.check("webp") else "jpeg"
+EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+SAVE_OPTIONS = {
+    "webp": {"quality": 80, "method": 4},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+}
+
+
+class Variant(NamedTuple):
+    """Una variante generada en disco"""
+    path: str
+    width: int
+
+
+# Hash del contenido por (ruta, mtime, tamaño) para no releer la fuente en cada
+# rerun, y variantes ya generadas por (hash, anchos, formato)
+_source_hashes = LRUCache(HASH_CACHE_MB * 1024 * 1024, sizeof=small_entry_bytes)
+_variants = LRUCache(HASH_CACHE_MB * 1024 * 1024,
+                     sizeof=lambda variants: SMALL_ENTRY_BYTES * (1 + len(variants)))
+metrics.register_cache("source_hash", _source_hashes)
+metrics.register_cache("variants", _variants)
+_lock = threading.Lock()
+
+
+def source_hash(image_path):
+    """Hash sha256 (abreviado) del contenido de la imagen fuente"""
+    key = file_key(image_path)
+    if key is None:
+        return None
+    digest = _source_hashes.get(key)
+    if digest is None:
+        with open(image_path, "rb") as img_file:
+            digest = hashlib.sha256(img_file.read()).hexdigest()[:16]
+        _source_hashes.put(key, digest)
+    return digest
+
+
+def variant_path(digest, width, fmt=FORMAT):
+    """Ruta en la caché de disco de una variante"""
+    return os.path.join(DERIVATIVE_DIR, f"{digest}-{width}{EXTENSIONS[fmt]}")
+
+
+def _save_variant(img, width, path, fmt):
+    """Redimensiona conservando proporción y guarda de forma atómica"""
+    height = max(1, round(img.height * width / img.width))
+    resized = img.resize((width, height), Image.LANCZOS)
+    if fmt == "jpeg" and resized.mode not in ("RGB", "L"):
+        resized = resized.convert("RGB")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    resized.save(tmp_path, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+    os.replace(tmp_path, path)
+
+
+def generate_derivatives(image_path, widths=DERIVATIVE_WIDTHS, fmt=FORMAT):
+    """Genera (o reutiliza) las variantes de una imagen; devuelve lista de Variant"""
+    digest = source_hash(image_path)
+    if digest is None:
+        return []
+    key = (digest, tuple(widths), fmt)
+    variants = _variants.get(key)
+    if variants is not None:
+        return variants
+
+    with _lock, resize_latency.time():
+        os.makedirs(DERIVATIVE_DIR, exist_ok=True)
+        with Image.open(image_path) as img:
+            img.load()
+            # Nunca ampliamos: si la fuente es más pequeña usamos su ancho
+            targets = sorted({min(w, img.width) for w in widths})
+            variants = []
+            for width in targets:
+                path = variant_path(digest, width, fmt)
+                if not os.path.exists(path):
+                    _save_variant(img, width, path, fmt)
+                variants.append(Variant(path, width))
+    _variants.put(key, variants)
+    return variants
+
+
+def _image_variants(image_path):
+    """Variantes de una imagen, de menor a mayor ancho; None si no hay o no es una imagen
+
+    Un archivo que Pillow no puede abrir no es una imagen: nunca se incrusta
+    ni se publica.
+    """
+    try:
+        generated = generate_derivatives(image_path)
+    except Exception as e:
+        logger.warning("No se pudieron generar variantes de %s: %s", image_path, e)
+        return None
+    return generated or None
+
+
+def srcset_attrs(image_path, sizes, url_for):
+    """Atributos src/srcset/sizes para un <img> con URLs; None si la imagen no existe
+
+    El navegador descarga sólo la variante que elige de ``srcset``; ``src``
+    (la más pequeña) es el respaldo.
+    """
+    variants = _image_variants(image_path)
+    if variants is None:
+        return None
+    srcset = ", ".join(f"{url_for(v.path)} {v.width}w" for v in variants)
+    return f'src="{url_for(variants[0].path)}" srcset="{srcset}" sizes="{sizes}"'
+
+
+def inline_attrs(image_path):
+    """Atributo src con la variante más pequeña como data URI; None si la imagen no existe
+
+    Todo lo incrustado viaja en el HTML a todos los clientes, así que no hay
+    srcset: cada variante extra serían bytes que nadie elige.
+    """
+    variants = _image_variants(image_path)
+    if variants is None:
+        return None
+    return f'src="{encode_image(variants[0].path)}"'
+
+
+_publisher = threading.local()
+
+
+@contextmanager
+def publishing_images(url_for):
+    """Dentro del bloque, ``image_attrs`` usa ``url_for`` para las URLs de las imágenes
+
+    Lo usa la exportación estática para escribir las imágenes junto al HTML
+    en lugar de generar data URIs o rutas de app/static/.
+    """
+    _publisher.url_for = url_for
+    try:
+        yield
+    finally:
+        del _publisher.url_for
+
+
+def image_attrs(image_path, sizes):
+    """Atributos del <img> según el modo configurado (data URI o URL estática)"""
+    url_for = getattr(_publisher, "url_for", None)
+    if url_for is not None:
+        return srcset_attrs(image_path, sizes, url_for)
+    if IMAGE_MODE == "static":
+        # URLs con hash servidas desde static/: el navegador las cachea
+        return srcset_attrs(image_path, sizes, publish_static)
+    return inline_attrs(image_path)
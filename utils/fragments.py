@@ -0,0 +1,273 @@
+"""Caché de fragmentos HTML por sección, invalidada por hash de sus archivos fuente
+
+Las claves de la caché llevan el nombre del tenant (``ana/projects:0``), así
+todos los portfolios del proceso comparten una única LRU y su presupuesto.
+
+Las secciones de CARDS se cachean además card a card, por el hash del
+contenido de cada registro: al editar una fila del CSV sólo se renderiza su
+card (y su imagen), y sólo se rehacen las páginas que la contienen, uniendo
+las cards ya cacheadas.
+"""
+import hashlib
+import logging
+import math
+import os
+import threading
+
+from utils import metrics
+from utils.cache import DerivedCache, LRUCache, SingleFlight, small_entry_bytes
+from utils.data import load_table
+from utils.images import file_key
+from utils.records import (normalize_education, normalize_profile,
+                           normalize_projects, normalize_skills, normalize_stem)
+from utils.render import (TEMPLATE_VERSION, render_education, render_profile,
+                          render_project_card, render_projects, render_skills, render_stem)
+from utils.settings import (CARD_CACHE_MB, FRAGMENT_CACHE_MB, HASH_CACHE_MB, IMAGE_MODE,
+                            PROJECTS_PAGE_SIZE)
+from utils.tenants import DEFAULT_TENANT
+from utils.watcher import is_watching, on_file_change
+
+logger = logging.getLogger(__name__)
+
+# Cada fragmento: (tabla CSV de origen, normalización a registros, render)
+SECTIONS = {
+    "profile": ("profile", normalize_profile, render_profile),
+    "skills": ("skills", normalize_skills, render_skills),
+    "projects": ("projects", normalize_projects, render_projects),
+    "education": ("education", normalize_education, render_education),
+    "stem": ("STEM", normalize_stem, render_stem),
+}
+
+# Secciones que se envían por páginas (registros por página); el resto, completas
+PAGINATED = {"projects": PROJECTS_PAGE_SIZE}
+
+# Secciones renderizadas card a card: render de una card (registro, images_dir)
+CARDS = {"projects": render_project_card}
+
+# Etiqueta de cada tab, en el orden en que se muestran (app y exportación estática)
+TAB_LABELS = {
+    "skills": "My skills",
+    "projects": "My projects",
+    "education": "Education",
+    "stem": "STEM Content Creation & Outreach",
+    "contact": "Contact",
+}
+
+# Hash de contenido por (ruta, mtime, tamaño): sólo se relee un archivo si cambió
+_fingerprints = LRUCache(HASH_CACHE_MB * 1024 * 1024, sizeof=small_entry_bytes)
+metrics.register_cache("fingerprint", _fingerprints)
+
+# Fragmentos renderizados, compartidos por todas las sesiones
+fragment_cache = LRUCache(FRAGMENT_CACHE_MB * 1024 * 1024, sizeof=lambda entry: entry[2].html_bytes)
+_fragment_builds = SingleFlight()
+metrics.register_cache("fragment", fragment_cache)
+
+# Cards de las secciones de CARDS: (dependencias con hash, Fragment, rutas absolutas)
+card_cache = LRUCache(CARD_CACHE_MB * 1024 * 1024, sizeof=lambda entry: entry[1].html_bytes)
+metrics.register_cache("card", card_cache)
+
+
+def fingerprint(path):
+    """Hash sha256 del contenido de un archivo; None si no existe"""
+    key = file_key(path)
+    if key is None:
+        return None
+    digest = _fingerprints.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        _fingerprints.put(key, digest)
+    return digest
+
+
+def _fragment_key(sources):
+    return (TEMPLATE_VERSION, IMAGE_MODE, tuple(fingerprint(p) for p in sources))
+
+
+def build_histogram(name):
+    """Histograma del tiempo de construcción del HTML de una sección"""
+    return metrics.histogram(f"section_{name}_build_seconds",
+                             f"Construcción del fragmento {name} (incluye carga e imágenes)")
+
+
+def html_bytes_histogram(name):
+    """Histograma del tamaño del HTML de una sección enviado en cada st.html"""
+    return metrics.histogram(f"section_{name}_html_bytes",
+                             f"Bytes del HTML de {name} enviados al navegador",
+                             buckets=metrics.BYTES_BUCKETS)
+
+
+def _build_fragment(name, build, sources, section, content):
+    # Una invalidación durante el render deja el fragmento sin guardar: con el
+    # observador activo no se volvería a comprobar y quedaría obsoleto
+    generation = fragment_cache.generation
+    key = _fragment_key(sources)
+    with build_histogram(section).time():
+        fragment = build()
+    fragment = fragment._replace(html_bytes=len(fragment.html.encode()))
+    deps = tuple((p, fingerprint(p)) for p in fragment.deps)
+    paths = frozenset(os.path.abspath(p) for p in (*sources, *fragment.deps))
+    fragment_cache.put(name, (key, deps, fragment, paths, content), generation)
+    return fragment
+
+
+def cached_fragment(name, build, sources, section=None, content=None):
+    """Devuelve el Fragment de una sección, reconstruyéndolo sólo si cambió algo
+
+    ``sources`` son los CSV de la sección; las dependencias descubiertas al
+    renderizar (p. ej. imágenes) se guardan en el propio fragmento.
+    ``content`` identifica los registros que muestra (hashes de sus cards):
+    si se indica, cambiar otras filas del CSV no invalida el fragmento.
+    ``section`` agrupa las métricas de varias entradas (p. ej. las páginas de
+    una misma sección); por defecto es ``name``. Con el
+    observador activo las entradas valen hasta que se invalidan; sin él se
+    comparan los hashes de los archivos en cada acceso.
+    """
+    entry = fragment_cache.get(name)
+    if entry is not None:
+        entry_key, deps, fragment, _, entry_content = entry
+        if entry_content == content and (
+                is_watching() or (entry_key == _fragment_key(sources)
+                                  and all(fingerprint(p) == h for p, h in deps))):
+            return fragment
+    return _fragment_builds.do(
+        name, lambda: _build_fragment(name, build, sources, section or name, content))
+
+
+def record_digest(record):
+    """Hash del contenido de un registro: clave de su card"""
+    return hashlib.sha1(repr(record).encode()).hexdigest()[:16]
+
+
+def cached_card(render_card, record, images_dir):
+    """Fragment de una card, memoizado por el contenido del registro y sus archivos
+
+    La imagen y la plantilla de la card son sus dependencias: se comprueban
+    por hash (o las descarta el observador) igual que en los fragmentos.
+    """
+    key = (TEMPLATE_VERSION, IMAGE_MODE, os.path.abspath(images_dir), record_digest(record))
+    entry = card_cache.get(key)
+    if entry is not None:
+        deps, card, _ = entry
+        if is_watching() or all(fingerprint(p) == h for p, h in deps):
+            return card
+    generation = card_cache.generation
+    card = render_card(record, images_dir)
+    card = card._replace(html_bytes=len(card.html.encode()))
+    deps = tuple((p, fingerprint(p)) for p in card.deps)
+    card_cache.put(key, (deps, card, frozenset(os.path.abspath(p) for p in card.deps)),
+                   generation)
+    return card
+
+
+@on_file_change
+def invalidate_fragments(path):
+    """Descarta sólo los fragmentos (y cards) que dependen del archivo modificado"""
+    fragment_cache.discard(lambda name, entry: path in entry[3])
+    card_cache.discard(lambda key, entry: path in entry[2])
+
+
+# Registros normalizados (e índices de búsqueda) por DataFrame de origen:
+# se liberan cuando la tabla sale de la caché de tablas
+derived = DerivedCache()
+
+
+def section_records(name, load=load_table):
+    """Registros de una sección; sólo se normalizan de nuevo si la tabla se recargó"""
+    table_name, normalize, _ = SECTIONS[name]
+    df = load(table_name)
+    return derived.get(df, name, lambda: normalize(df))
+
+
+def page_title(tenant=DEFAULT_TENANT):
+    """Título de la página: el de tenant.json o "<perfil> - Portfolio" a partir del CSV"""
+    if tenant.title:
+        return tenant.title
+    try:
+        profiles = section_records("profile", tenant.load_table)
+    except Exception as e:
+        # Sin perfil legible el error ya se muestra en la sección; el título no falla
+        logger.warning("No se pudo leer el perfil de %s: %s", tenant.data_dir, e)
+        profiles = ()
+    name = profiles[0].name.strip() if profiles else ""
+    return f"{name} - Portfolio" if name else "Portfolio"
+
+
+def record_digests(name, load=load_table):
+    """Hash de cada registro de una sección de CARDS (se calcula una vez por tabla)"""
+    table_name = SECTIONS[name][0]
+    df = load(table_name)
+    return derived.get(df, f"{name}:digests",
+                       lambda: tuple(record_digest(r) for r in section_records(name, load)))
+
+
+def page_count(name, load=load_table, ids=None):
+    """Número de páginas de una sección paginada (al menos una)"""
+    total = len(section_records(name, load)) if ids is None else len(ids)
+    return max(1, math.ceil(total / PAGINATED[name]))
+
+
+def section_fragment(name, load=None, page=None, ids=None, tenant=DEFAULT_TENANT):
+    """Fragment de una sección registrada en SECTIONS
+
+    ``ids`` limita la sección a esos registros (resultado de una búsqueda) y
+    ``page`` a una página de PAGINATED; cada combinación se cachea aparte.
+    ``load`` carga las tablas (por defecto, las del ``tenant``).
+    """
+    load = load or tenant.load_table
+    table_name, normalize, render = SECTIONS[name]
+    sources = [tenant.table_path(table_name)]
+    if page is None and ids is None and name not in CARDS:
+        return cached_fragment(
+            tenant.cache_key(name),
+            lambda: render(normalize(load(table_name)), images_dir=tenant.images_dir),
+            sources, section=name)
+
+    def select(items):
+        selected = range(len(items)) if ids is None else ids
+        if page is not None:
+            size = PAGINATED[name]
+            selected = selected[page * size:(page + 1) * size]
+        return tuple(items[i] for i in selected)
+
+    def build():
+        records = select(section_records(name, load))
+        if name not in CARDS:
+            return render(records, images_dir=tenant.images_dir)
+        render_card = CARDS[name]
+        return render(records, images_dir=tenant.images_dir,
+                      card=lambda record, images_dir: cached_card(render_card, record, images_dir))
+
+    key = name
+    if ids is not None:
+        key += ":" + hashlib.sha1(repr(ids).encode()).hexdigest()[:16]
+    if page is not None:
+        key += f":{page}"
+    if name in CARDS:
+        # La página depende de sus registros, no del CSV completo: editar una
+        # fila sólo rehace las páginas en las que aparece
+        return cached_fragment(tenant.cache_key(key), build, (), section=name,
+                               content=select(record_digests(name, load)))
+    return cached_fragment(tenant.cache_key(key), build, sources, section=name)
+
+
+_prefetch_lock = threading.Lock()
+
+
+def _prefetch(names, tenant):
+    try:
+        for name in names:
+            # De las secciones paginadas sólo se precarga la primera página
+            section_fragment(name, page=0 if name in PAGINATED else None, tenant=tenant)
+    except Exception as e:
+        logger.warning("Fallo al precargar fragmentos %s: %s", names, e)
+    finally:
+        _prefetch_lock.release()
+
+
+def prefetch_fragments(names, tenant=DEFAULT_TENANT):
+    """Renderiza en segundo plano las secciones indicadas (si no hay otra precarga en curso)"""
+    if not _prefetch_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_prefetch, args=(list(names), tenant),
+                     name="fragment-prefetch", daemon=True).start()
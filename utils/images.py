@@ -0,0 +1,75 @@
+"""Pipeline de imágenes: codificación base64 cacheada por ruta, mtime y tamaño"""
+import base64
+import os
+
+from utils import metrics
+from utils.cache import LRUCache
+from utils.settings import IMAGE_CACHE_MB
+from utils.watcher import on_file_change
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+IMAGES_DIR = "Images"
+
+# Caché de proceso: la comparten todas las sesiones y sobrevive a los reruns
+image_cache = LRUCache(IMAGE_CACHE_MB * 1024 * 1024)
+
+metrics.register_cache("image", image_cache)
+encode_latency = metrics.histogram(
+    "image_encode_seconds", "Lectura y codificación base64 de una imagen (fallos de caché)")
+
+
+def image_path(images_dir, name):
+    """Ruta de una imagen del CSV dentro de ``images_dir``; None si apunta fuera
+
+    Los nombres vienen del contenido de cada tenant: ``../`` o rutas absolutas
+    no deben poder leer (ni publicar) archivos de otras carpetas.
+    """
+    root = os.path.realpath(images_dir)
+    resolved = os.path.realpath(os.path.join(images_dir, name))
+    if os.path.commonpath([root, resolved]) != root:
+        return None
+    return f"{images_dir}/{name}"
+
+
+def mime_type(image_path):
+    """Detecta el tipo de imagen por extensión (por defecto JPEG)"""
+    return MIME_TYPES.get(os.path.splitext(image_path)[1].lower(), "image/jpeg")
+
+
+def file_key(path):
+    """Clave de caché (ruta, mtime, tamaño); None si el archivo no existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def encode_image(image_path):
+    """Devuelve la imagen como data URI; sólo lee el disco si cambió el archivo"""
+    key = file_key(image_path)
+    if key is None:
+        return None
+    data_uri = image_cache.get(key)
+    if data_uri is None:
+        with encode_latency.time(), open(image_path, "rb") as img_file:
+            img_base64 = base64.b64encode(img_file.read()).decode()
+        # Descartamos versiones anteriores del mismo archivo
+        image_cache.discard(lambda k, _: k[0] == key[0])
+        data_uri = image_cache.put(
+            key, f"data:{mime_type(image_path)};base64,{img_base64}")
+    return data_uri
+
+
+@on_file_change
+def invalidate_image(path):
+    """Descarta de la caché todas las versiones codificadas de un archivo"""
+    path = os.path.abspath(path)
+    image_cache.discard(lambda k, _: k[0] == path)
@@ -0,0 +1,178 @@
+"""Métricas de proceso (contadores, histogramas y spans) compartidas por todas las sesiones
+
+Se exportan como JSON (``to_json``) o en el formato de texto de Prometheus
+(``to_prometheus``); el panel de diagnóstico de portfolio.py muestra ambos.
+"""
+import bisect
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites (segundos) de los buckets de latencia por defecto
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Límites (bytes) de los buckets para tamaños de payload
+BYTES_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+class Counter:
+    """Contador monótono"""
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {"type": "counter", "value": self.value}
+
+
+class Histogram:
+    """Histograma acumulado por buckets, con suma y número de observaciones"""
+
+    def __init__(self, name, help="", buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Observa la duración (segundos) del bloque ``with``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """Estimación del cuantil q a partir del límite superior de los buckets"""
+        with self._lock:
+            if not self.count:
+                return None
+            target = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+                seen += count
+                if seen >= target:
+                    return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {"type": "histogram", "count": self.count, "sum": self.sum,
+                "buckets": dict(zip(map(str, self.buckets + (float("inf"),)), self.counts)),
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95),
+                "p99": self.quantile(0.99)}
+
+
+class CallbackMetric:
+    """Valor leído al exportar (p. ej. contadores de una LRUCache)"""
+
+    def __init__(self, name, fn, help="", kind="gauge"):
+        self.name = name
+        self.fn = fn
+        self.help = help
+        self.kind = kind
+
+    def snapshot(self):
+        return {"type": self.kind, "value": self.fn()}
+
+
+def counter(name, help=""):
+    """Contador registrado (el mismo objeto para el mismo nombre)"""
+    return _register(Counter(name, help))
+
+
+def histogram(name, help="", buckets=LATENCY_BUCKETS):
+    """Histograma registrado (el mismo objeto para el mismo nombre)"""
+    return _register(Histogram(name, help, buckets))
+
+
+def callback(name, fn, help="", kind="gauge"):
+    """Métrica cuyo valor se obtiene llamando a ``fn`` (kind: "gauge" o "counter")"""
+    return _register(CallbackMetric(name, fn, help, kind))
+
+
+def register_cache(prefix, cache):
+    """Expone aciertos, fallos, expulsiones y ocupación de una LRUCache"""
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter")):
+        callback(f"{prefix}_cache_{field}_total", lambda f=field: cache.stats()[f],
+                 f"Caché {prefix}: {field}", kind="counter")
+    for field in ("entries", "bytes"):
+        callback(f"{prefix}_cache_{field}", lambda f=field: cache.stats()[f],
+                 f"Caché {prefix}: {field}")
+
+
+@contextmanager
+def span(name, help=""):
+    """Mide una fase en el histograma ``<name>_seconds``; sirve también como decorador"""
+    with histogram(f"{name}_seconds", help).time():
+        yield
+
+
+def snapshot():
+    """Valores actuales de todas las métricas registradas"""
+    with _registry_lock:
+        metrics = dict(_registry)
+    return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+
+
+def to_json():
+    """Instantánea de todas las métricas como JSON"""
+    return json.dumps(snapshot(), indent=2, default=str)
+
+
+def _prometheus_number(value):
+    if value is None:
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def to_prometheus():
+    """Todas las métricas en el formato de texto de exposición de Prometheus"""
+    with _registry_lock:
+        metrics = dict(_registry)
+    lines = []
+    for name, metric in sorted(metrics.items()):
+        data = metric.snapshot()
+        if metric.help:
+            help_text = metric.help.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        if data["type"] == "histogram":
+            # Los buckets de Prometheus son acumulados
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float("inf"),), metric.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{le="{_prometheus_number(bound)}"}} {cumulative}')
+            lines.append(f"{name}_sum {_prometheus_number(data['sum'])}")
+            lines.append(f"{name}_count {data['count']}")
+        else:
+            lines.append(f"{name} {_prometheus_number(data['value'])}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,137 @@
+"""Normalización de los CSV a registros tipados e inmutables (sin iterrows)"""
+import re
+from itertools import chain
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+
+class Profile(NamedTuple):
+    name: str
+    description: str
+    tagline: str
+    linkedin: str
+    github: str
+    instagram: str
+    picture: str
+
+
+class Skill(NamedTuple):
+    name: str
+    notes: str
+
+
+class Project(NamedTuple):
+    name: str
+    description: str
+    skills: tuple
+    knowledge: tuple
+    image: Optional[str]
+    link: str
+
+
+class Education(NamedTuple):
+    name: str
+    degree: str
+    date: str
+    knowledge: tuple
+
+
+class Stem(NamedTuple):
+    name: str
+    description: str
+    instagram: str
+
+
+def column(df, name, default):
+    """Columna como texto, con el valor por defecto si falta la columna o la celda"""
+    if name not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[name].astype(object).where(df[name].notna(), default).astype(str)
+
+
+def split_column(series, sep):
+    """Divide cada celda por ``sep`` y devuelve tuplas sin elementos vacíos"""
+    # Quitamos espacios y separadores repetidos con regex vectorizadas antes de dividir
+    sep_re = re.escape(sep)
+    cleaned = (series.str.replace(rf"\s*{sep_re}[\s{sep_re}]*", sep, regex=True)
+               .str.strip().str.strip(sep))
+    parts = cleaned.where(cleaned != "").str.split(sep)
+    return pd.Series([tuple(p) if isinstance(p, list) else () for p in parts],
+                     index=series.index, dtype=object)
+
+
+def first_token(series):
+    """Primer token separado por espacios (p. ej. 'perfil.jpg (https://...)')"""
+    return series.str.split(n=1).str[0]
+
+
+def normalize_profile(df):
+    """Primer registro del CSV profile"""
+    if df.empty:
+        return ()
+    df = df.iloc[:1]
+    picture = first_token(column(df, "Picture", "")).fillna("placeholder.jpg")
+    return tuple(map(Profile._make, zip(
+        column(df, "Name", "Nombre no disponible"),
+        column(df, "Description", "Descripción no disponible"),
+        column(df, "Tagline", "Tagline no disponible"),
+        column(df, "Linkedin", "#"),
+        column(df, "GitHub", "#"),
+        column(df, "Instagram", "#"),
+        picture,
+    )))
+
+
+def normalize_skills(df):
+    """Registros Skill desde el CSV skills"""
+    return tuple(map(Skill._make, zip(
+        column(df, "Name", "Habilidad sin nombre"),
+        column(df, "Notes", "Descripción no disponible"),
+    )))
+
+
+def normalize_projects(df):
+    """Registros Project con Skills/Knowledge divididos por comas"""
+    image = first_token(column(df, "Image", ""))
+    return tuple(map(Project._make, zip(
+        column(df, "Name", "Project Name"),
+        column(df, "Description", "No description available"),
+        split_column(column(df, "Skills", ""), ","),
+        split_column(column(df, "Knowledge", ""), ","),
+        image.where(image.notna(), None),
+        column(df, "Link", "#"),
+    )))
+
+
+def normalize_education(df):
+    """Registros Education agrupados por Name y Degree, Knowledge dividido por '#'"""
+    if df.empty:
+        return ()
+    frame = pd.DataFrame({
+        "Name": column(df, "Name", "").str.strip(),
+        "Degree": column(df, "Degree", "").str.strip(),
+        "Date": column(df, "Date", ""),
+        "Knowledge": split_column(column(df, "Knowledge", "").str.strip(), "#"),
+    })
+    # Un único groupby reemplaza al diccionario de agrupación fila a fila
+    grouped = frame.groupby(["Name", "Degree"], sort=False).agg(
+        Date=("Date", "first"),
+        Knowledge=("Knowledge", lambda values: tuple(chain.from_iterable(values))),
+    ).reset_index()
+    return tuple(map(Education._make, zip(
+        grouped["Name"].where(grouped["Name"] != "", "Institución no especificada"),
+        grouped["Degree"].where(grouped["Degree"] != "", "Grado no especificado"),
+        grouped["Date"].where(grouped["Date"] != "", "Fecha no especificada"),
+        grouped["Knowledge"].apply(
+            lambda knowledge: knowledge or ("Conocimientos no especificados",)),
+    )))
+
+
+def normalize_stem(df):
+    """Registros Stem desde el CSV STEM"""
+    return tuple(map(Stem._make, zip(
+        column(df, "Name", "Título no disponible"),
+        column(df, "Description", "Descripción no disponible"),
+        column(df, "Instagram", "#"),
+    )))
@@ -0,0 +1,166 @@
+"""Construcción del HTML de cada sección del portfolio a partir de los CSV
+
+Las cards están en templates/ como plantillas Jinja2 con autoescape: se
+compilan una vez por proceso (el bytecode queda en .cache/jinja para los
+arranques en frío) y cada sección se renderiza con una sola llamada, con el
+bucle de cards dentro de la plantilla. Al cargarlas se quita la indentación
+y las líneas vacías, que no aportan nada al HTML enviado.
+
+Todas las funciones ``render_*`` reciben los registros y ``images_dir``, la
+carpeta de las imágenes del portfolio (cada tenant tiene la suya).
+"""
+import os
+import threading
+from typing import NamedTuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+from markupsafe import Markup
+
+from utils.derivatives import image_attrs
+from utils.images import IMAGES_DIR, image_path
+from utils.records import Profile
+from utils.settings import CACHE_DIR
+
+# Incrementar al cambiar cómo se renderizan las plantillas para invalidar los
+# fragmentos cacheados (los cambios en templates/ se detectan por su hash)
+TEMPLATE_VERSION = 5
+
+TEMPLATES_DIR = "templates"
+JINJA_CACHE_DIR = os.path.join(CACHE_DIR, "jinja")
+
+# Ancho en pantalla de cada imagen, para que el navegador elija la variante
+PROFILE_IMAGE_SIZES = "(max-width: 480px) 100px, (max-width: 768px) 150px, 250px"
+PROJECT_IMAGE_SIZES = "(max-width: 600px) 100vw, (max-width: 992px) 50vw, 33vw"
+
+
+# Perfil mostrado cuando el CSV está vacío
+DEFAULT_PROFILE = Profile("Nombre no disponible", "Descripción no disponible",
+                          "Tagline no disponible", "#", "#", "#", "placeholder.jpg")
+
+
+class Fragment(NamedTuple):
+    """HTML renderizado, archivos de los que depende y avisos para mostrar
+
+    ``html_bytes`` (tamaño en UTF-8) lo rellena la caché de fragmentos al
+    guardarlo, para no codificar el HTML de nuevo en cada ejecución.
+    """
+    html: str
+    deps: tuple = ()
+    warnings: tuple = ()
+    html_bytes: int = 0
+
+
+class StrippedLoader(FileSystemLoader):
+    """Quita la indentación y las líneas vacías de las plantillas al cargarlas"""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        lines = (line.strip() for line in source.splitlines())
+        return "\n".join(line for line in lines if line), filename, uptodate
+
+
+_env = None
+_env_lock = threading.Lock()
+
+
+def template_env():
+    """Entorno Jinja2 del proceso (se crea la primera vez que se usa)"""
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+                _env = Environment(
+                    loader=StrippedLoader(TEMPLATES_DIR),
+                    autoescape=True,
+                    trim_blocks=True,
+                    lstrip_blocks=True,
+                    undefined=StrictUndefined,
+                    bytecode_cache=FileSystemBytecodeCache(JINJA_CACHE_DIR),
+                )
+    return _env
+
+
+def template_path(name):
+    """Ruta de una plantilla (dependencia de los fragmentos que la usan)"""
+    return os.path.join(TEMPLATES_DIR, name)
+
+
+def render_template(name, **context):
+    """HTML de una plantilla de templates/"""
+    return template_env().get_template(name).render(**context)
+
+
+def render_profile(profiles, images_dir=IMAGES_DIR):
+    """Plantilla de "Perfil" con las clases CSS de MaterializeCSS"""
+    profile = profiles[0] if profiles else DEFAULT_PROFILE
+
+    # ========== PROCESAMIENTO DE IMAGEN DE PERFIL CON VARIANTES ==========
+    picture_path = image_path(images_dir, profile.picture)
+    picture_attrs = image_attrs(picture_path, PROFILE_IMAGE_SIZES) if picture_path else None
+    deps = (template_path("profile.html"),)
+    warnings = ()
+
+    # Si no se pudo cargar la imagen, la plantilla muestra un placeholder
+    if picture_attrs is None:
+        warnings = (f"⚠️ No se pudo cargar la imagen de perfil: {images_dir}/{profile.picture}",)
+    if picture_path:
+        deps = (picture_path, *deps)
+
+    # Los atributos src/srcset los genera utils.derivatives (no vienen del CSV)
+    html = render_template("profile.html", profile=profile,
+                           picture_attrs=Markup(picture_attrs) if picture_attrs else None)
+    return Fragment(html, deps, warnings)
+
+
+def render_skills(skills, images_dir=IMAGES_DIR):
+    """Cards "Skills" con las clases CSS de MaterializeCSS"""
+    return Fragment(render_template("skills.html", skills=skills),
+                    (template_path("skills.html"),))
+
+
+def render_project_card(project, images_dir=IMAGES_DIR):
+    """Una card de "Projects" (Fragment con su imagen y plantilla como dependencias)"""
+    deps = (template_path("project_card.html"),)
+    warnings = ()
+
+    # ========== PROCESAMIENTO DE IMAGEN DEL PROYECTO CON VARIANTES ==========
+    project_image_attrs = None
+    if project.image:
+        project_image_path = image_path(images_dir, project.image)
+        if project_image_path:
+            deps += (project_image_path,)
+            project_image_attrs = image_attrs(project_image_path, PROJECT_IMAGE_SIZES)
+        if project_image_attrs is None:
+            warnings = (f"⚠️ Imagen no encontrada: {images_dir}/{project.image}",)
+
+    # Sin imagen la plantilla muestra un placeholder
+    html = render_template("project_card.html", project=project,
+                           image_attrs=Markup(project_image_attrs) if project_image_attrs else None)
+    return Fragment(html, deps, warnings)
+
+
+def render_projects(projects_list, images_dir=IMAGES_DIR, card=render_project_card):
+    """Cards "Projects" con las clases CSS de MaterializeCSS
+
+    ``card`` renderiza cada proyecto; utils.fragments pasa una versión
+    memoizada para no rehacer las cards que no cambiaron.
+    """
+    cards = [card(project, images_dir) for project in projects_list]
+    deps = {template_path("projects.html"): None}
+    for c in cards:
+        deps.update(dict.fromkeys(c.deps))
+    html = render_template("projects.html", cards=[Markup(c.html) for c in cards])
+    return Fragment(html, tuple(deps), tuple(w for c in cards for w in c.warnings))
+
+
+def render_education(education, images_dir=IMAGES_DIR):
+    """Cards "Education" con las clases CSS de MaterializeCSS"""
+    return Fragment(render_template("education.html", education=education),
+                    (template_path("education.html"),))
+
+
+def render_stem(stem_records, images_dir=IMAGES_DIR):
+    """Cards "STEM Content Creation & Outreach" con las clases CSS de MaterializeCSS"""
+    return Fragment(render_template("stem.html", stem_records=stem_records),
+                    (template_path("stem.html"),))
@@ -0,0 +1,113 @@
+"""Índice invertido y facetas sobre los registros de Projects y Skills
+
+El índice se construye una vez por versión de los datos (se guarda junto a
+los registros de ``section_records``, ligado al DataFrame de la tabla) y cada
+búsqueda es una intersección de conjuntos de ids: no se recorre ningún
+DataFrame al teclear.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from utils.data import load_table
+from utils.fragments import SECTIONS, derived, section_records
+
+# Campos indexados por sección y campos que se ofrecen como facetas (chips)
+SEARCH_FIELDS = {
+    "projects": ("name", "description", "skills", "knowledge"),
+    "skills": ("name", "notes"),
+}
+FACET_FIELDS = {
+    "projects": ("skills", "knowledge"),
+}
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_text(text):
+    """Minúsculas y sin acentos, para que 'analisis' encuentre 'Análisis'"""
+    text = str(text).lower()
+    if text.isascii():
+        # Caso habitual: nada que descomponer
+        return text
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Palabras normalizadas de un texto"""
+    return TOKEN_RE.findall(normalize_text(text))
+
+
+class SearchIndex:
+    """Postings por palabra y conjuntos de ids por chip, con conteos precalculados"""
+
+    def __init__(self, records, fields, facets=()):
+        self.size = len(records)
+        postings = defaultdict(set)
+        facet_ids = {facet: defaultdict(set) for facet in facets}
+        for doc_id, record in enumerate(records):
+            # Un solo texto por registro: se normaliza y tokeniza una vez
+            text = " ".join(" ".join(value) if isinstance(value, tuple) else str(value)
+                            for value in map(record._asdict().get, fields))
+            for token in set(tokenize(text)):
+                postings[token].add(doc_id)
+            for facet in facets:
+                for chip in getattr(record, facet):
+                    facet_ids[facet][chip].add(doc_id)
+
+        self.postings = {token: frozenset(ids) for token, ids in postings.items()}
+        # Vocabulario ordenado: las búsquedas por prefijo son un rango con bisect
+        self.vocabulary = sorted(self.postings)
+        self.facets = {facet: {chip: frozenset(ids) for chip, ids in chips.items()}
+                       for facet, chips in facet_ids.items()}
+        # Chips de cada faceta ordenados por número de registros (y nombre)
+        self.facet_counts = {
+            facet: sorted(((chip, len(ids)) for chip, ids in chips.items()),
+                          key=lambda item: (-item[1], item[0].lower()))
+            for facet, chips in self.facets.items()}
+        self._prefixes = {}
+        self._lock = threading.Lock()
+
+    def prefix_ids(self, prefix):
+        """Ids de los registros con alguna palabra que empieza por ``prefix``"""
+        ids = self._prefixes.get(prefix)
+        if ids is None:
+            start = bisect.bisect_left(self.vocabulary, prefix)
+            end = bisect.bisect_left(self.vocabulary, prefix + "\uffff", start)
+            ids = frozenset().union(*(self.postings[t] for t in self.vocabulary[start:end]))
+            with self._lock:
+                if len(self._prefixes) > 4096:
+                    self._prefixes.clear()
+                self._prefixes[prefix] = ids
+        return ids
+
+    def search(self, query="", filters=None):
+        """Ids (en el orden del CSV) que contienen todas las palabras y todos los chips
+
+        Cada palabra de ``query`` se busca como prefijo, para que los
+        resultados ya sirvan mientras se escribe. ``filters`` es un dict
+        faceta -> chips seleccionados.
+        """
+        candidate_sets = [self.prefix_ids(token) for token in tokenize(query)]
+        for facet, chips in (filters or {}).items():
+            candidate_sets.extend(self.facets[facet].get(chip, frozenset()) for chip in chips)
+        if not candidate_sets:
+            return tuple(range(self.size))
+        # Intersección empezando por el conjunto más pequeño
+        candidate_sets.sort(key=len)
+        result = set(candidate_sets[0])
+        for ids in candidate_sets[1:]:
+            result.intersection_update(ids)
+            if not result:
+                break
+        return tuple(sorted(result))
+
+
+def section_index(name, load=load_table):
+    """Índice de una sección; se reconstruye sólo si se recargó su tabla"""
+    df = load(SECTIONS[name][0])
+    return derived.get(df, f"{name}:index", lambda: SearchIndex(
+        section_records(name, load), SEARCH_FIELDS[name], FACET_FIELDS.get(name, ())))
@@ -0,0 +1,71 @@
+"""Configuración del portfolio leída desde variables de entorno"""
+import os
+
+
+def env_int(name, default):
+    """Lee un entero desde el entorno con valor por defecto"""
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# Carpeta con los CSV de contenido (el benchmark la apunta a datos sintéticos)
+DATA_DIR = os.environ.get("PORTFOLIO_DATA_DIR", "Data")
+
+# Varios portfolios en un proceso: carpeta con una subcarpeta por tenant
+# (<tenant>/Data, <tenant>/Images). Vacío = un único portfolio en Data/ e Images/
+TENANTS_DIR = os.environ.get("PORTFOLIO_TENANTS_DIR", "")
+
+# Dominio base para elegir el tenant por subdominio (ana.<dominio>); si no,
+# se usa ?tenant=ana o PORTFOLIO_DEFAULT_TENANT
+TENANT_DOMAIN = os.environ.get("PORTFOLIO_TENANT_DOMAIN", "").strip().lower()
+DEFAULT_TENANT_NAME = os.environ.get("PORTFOLIO_DEFAULT_TENANT", "").strip().lower()
+
+# Presupuestos de memoria (MB) de las cachés de proceso, compartidos por todos
+# los tenants: imágenes en base64, tablas cargadas, fragmentos HTML y cards.
+# HASH_CACHE_MB acota cada caché de metadatos por archivo (hashes, variantes, URLs)
+IMAGE_CACHE_MB = env_int("PORTFOLIO_IMAGE_CACHE_MB", 64)
+TABLE_CACHE_MB = env_int("PORTFOLIO_TABLE_CACHE_MB", 128)
+FRAGMENT_CACHE_MB = env_int("PORTFOLIO_FRAGMENT_CACHE_MB", 32)
+CARD_CACHE_MB = env_int("PORTFOLIO_CARD_CACHE_MB", 32)
+HASH_CACHE_MB = env_int("PORTFOLIO_HASH_CACHE_MB", 4)
+
+# Anchos (px) de las variantes redimensionadas de las imágenes
+DERIVATIVE_WIDTHS = tuple(
+    int(w) for w in os.environ.get("PORTFOLIO_DERIVATIVE_WIDTHS", "320,640,960").split(",") if w.strip())
+
+# Carpeta de la caché en disco (variantes, artefactos generados)
+CACHE_DIR = os.environ.get("PORTFOLIO_CACHE_DIR", ".cache")
+
+# Modo de entrega de imágenes: "inline" (data URI) o "static" (URLs con hash
+# servidas por Streamlit; requiere server.enableStaticServing)
+IMAGE_MODE = os.environ.get("PORTFOLIO_IMAGE_MODE", "inline").strip().lower()
+
+# Carpeta que Streamlit sirve en app/static/ (junto a portfolio.py)
+STATIC_DIR = os.environ.get("PORTFOLIO_STATIC_DIR", "static")
+
+# Proyectos por página en la galería del tab Projects
+PROJECTS_PAGE_SIZE = max(1, env_int("PORTFOLIO_PROJECTS_PAGE_SIZE", 12))
+
+# Tabs perezosos: sólo se construye la sección seleccionada (?tab=skills, ...)
+LAZY_TABS = os.environ.get("PORTFOLIO_LAZY_TABS", "").strip().lower() in ("1", "true", "yes")
+
+# Token del panel de diagnóstico (?diagnostics=<token>); también en secrets como
+# DIAGNOSTICS_TOKEN. Sin token el panel no se muestra
+DIAGNOSTICS_TOKEN = os.environ.get("PORTFOLIO_DIAGNOSTICS_TOKEN", "")
+
+# Endpoint de la API de Airtable (se puede apuntar a un stub local para pruebas)
+AIRTABLE_ENDPOINT_URL = os.environ.get("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
+
+# Base de Airtable donde se guardan los contactos
+AIRTABLE_BASE_ID = os.environ.get("AIRTABLE_BASE_ID", "appGyrt1M9uOvi9cr")
+
+# Cola persistente de mensajes del formulario de contacto (SQLite)
+CONTACT_QUEUE_PATH = os.environ.get(
+    "PORTFOLIO_CONTACT_QUEUE", os.path.join(CACHE_DIR, "contact_queue.sqlite3"))
+
+# Cliente de Airtable: tamaño del pool de conexiones y timeouts (segundos)
+AIRTABLE_POOL_SIZE = env_int("AIRTABLE_POOL_SIZE", 10)
+AIRTABLE_CONNECT_TIMEOUT = float(os.environ.get("AIRTABLE_CONNECT_TIMEOUT", 3.05))
+AIRTABLE_READ_TIMEOUT = float(os.environ.get("AIRTABLE_READ_TIMEOUT", 15))
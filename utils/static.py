@@ -0,0 +1,53 @@
+"""Publicación de archivos en la carpeta static/ con nombres por hash de contenido"""
+import hashlib
+import os
+import shutil
+import threading
+
+from utils import metrics
+from utils.cache import LRUCache, small_entry_bytes
+from utils.images import file_key
+from utils.settings import HASH_CACHE_MB, STATIC_DIR
+
+# Streamlit sirve STATIC_DIR en esta ruta relativa a la página
+STATIC_URL_PREFIX = "app/static"
+
+# URL publicada por (ruta, mtime, tamaño)
+_urls = LRUCache(HASH_CACHE_MB * 1024 * 1024, sizeof=small_entry_bytes)
+metrics.register_cache("static_url", _urls)
+_lock = threading.Lock()
+
+
+def content_hash(path):
+    """sha256 abreviado del contenido de un archivo"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def publish_static(path, subdir="img"):
+    """Copia el archivo a static/<subdir>/ como nombre.<hash>.ext y devuelve su URL
+
+    El parámetro ``v`` hace que el StaticFileHandler de Tornado responda con
+    Cache-Control de larga duración; al cambiar el contenido cambia el nombre.
+    """
+    key = file_key(path)
+    if key is None:
+        return None
+    url = _urls.get(key)
+    if url is not None:
+        return url
+
+    digest = content_hash(path)
+    stem, ext = os.path.splitext(os.path.basename(path))
+    filename = f"{stem}.{digest}{ext.lower()}"
+    target_dir = os.path.join(STATIC_DIR, subdir)
+    target = os.path.join(target_dir, filename)
+
+    with _lock:
+        if not os.path.exists(target):
+            os.makedirs(target_dir, exist_ok=True)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+    url = f"{STATIC_URL_PREFIX}/{subdir}/{filename}?v={digest}"
+    return _urls.put(key, url)
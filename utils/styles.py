@@ -0,0 +1,108 @@
+"""Empaquetado de las hojas de estilo del portfolio en un único bloque minificado"""
+import hashlib
+import os
+import re
+from typing import NamedTuple
+
+from utils.images import file_key
+
+CSS_DIR = os.path.join("assets", "css")
+
+# CSS de las librerías recortado por ``python -m tools.vendor_assets``
+VENDOR_CSS = os.path.join("assets", "vendor", "vendor.min.css")
+
+# Orden de concatenación (el mismo en que se inyectaban antes por separado)
+STYLESHEETS = ("base.css", "profile.css", "skills.css", "projects.css", "education.css")
+
+# Librerías externas que se cargan con <link> si no se generó VENDOR_CSS
+EXTERNAL_STYLESHEETS = (
+    '<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/materialize/1.0.0/css/materialize.min.css">',
+    '<link href="https://fonts.googleapis.com/icon?family=Material+Icons" rel="stylesheet">',
+    '<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.7.2/css/all.min.css" integrity="sha512-Evv84Mr4kqVGRNSgIGL/F/aIDqQb7xQ2vcrdIwxfjThSH8CSR7PBEakCr51Ck+w+/U6swU2Im1vVX0SVk9ABhg==" crossorigin="anonymous" referrerpolicy="no-referrer" />',
+)
+
+
+class StyleBundle(NamedTuple):
+    css: str
+    digest: str
+
+
+def minify_css(css):
+    """Quita comentarios y espacios sobrantes de una hoja de estilo"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    # Antes de ':' el espacio es significativo en selectores (".card ::-webkit-scrollbar")
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+_bundles = {}
+
+
+def stylesheet_bundle(names=STYLESHEETS, css_dir=CSS_DIR):
+    """Concatena y minifica las hojas de estilo; se recalcula sólo si cambió algún archivo"""
+    paths = [os.path.join(css_dir, name) for name in names]
+    key = tuple(file_key(path) for path in paths)
+    bundle = _bundles.get(key)
+    if bundle is None:
+        parts = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                parts.append(minify_css(f.read()))
+        css = "".join(parts)
+        bundle = StyleBundle(css, hashlib.sha256(css.encode()).hexdigest()[:16])
+        _bundles.clear()
+        _bundles[key] = bundle
+    return bundle
+
+
+_vendor_bundles = {}
+
+
+def vendor_bundle(path=VENDOR_CSS):
+    """CSS vendorizado (ya minificado) o None si no se ha generado"""
+    key = file_key(path)
+    if key is None:
+        return None
+    bundle = _vendor_bundles.get(key)
+    if bundle is None:
+        with open(path, encoding="utf-8") as f:
+            css = f.read()
+        bundle = StyleBundle(css, hashlib.sha256(css.encode()).hexdigest()[:16])
+        _vendor_bundles.clear()
+        _vendor_bundles[key] = bundle
+    return bundle
+
+
+_heads = {}
+
+
+def head_html():
+    """Un único bloque con las librerías (vendorizadas o por CDN) y el CSS propio empaquetado
+
+    Devuelve siempre el mismo objeto str mientras no cambien las hojas de
+    estilo: cada sesión guarda el de su última ejecución (los st.fragment
+    conservan las globales del script) y así no hay una copia por sesión.
+    """
+    bundle = stylesheet_bundle()
+    vendor = vendor_bundle()
+    key = (bundle.digest, vendor.digest if vendor is not None else None)
+    entry = _heads.get(key)
+    if entry is None:
+        if vendor is None:
+            head = "".join(EXTERNAL_STYLESHEETS)
+        else:
+            # Mismo orden de cascada que con los <link>: librerías antes que el CSS propio
+            head = f'<style data-vendor="{vendor.digest}">{vendor.css}</style>'
+        head += f'<style data-bundle="{bundle.digest}">{bundle.css}</style>'
+        entry = (head, len(head.encode()))
+        _heads.clear()
+        _heads[key] = entry
+    return entry[0]
+
+
+def head_html_bytes():
+    """Tamaño en bytes (UTF-8) de ``head_html()``, calculado una sola vez"""
+    head_html()
+    return next(iter(_heads.values()))[1]
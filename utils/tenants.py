@@ -0,0 +1,124 @@
+"""Varios portfolios (tenants) servidos desde un mismo proceso
+
+Con PORTFOLIO_TENANTS_DIR cada subcarpeta es un portfolio independiente:
+
+    tenants/
+      ana/Data/*.csv   ana/Images/...   ana/tenant.json (opcional)
+      luis/Data/*.csv  luis/Images/...
+
+El tenant se elige por subdominio (``ana.<PORTFOLIO_TENANT_DOMAIN>``), por
+``?tenant=ana`` o, si no se indica, PORTFOLIO_DEFAULT_TENANT. ``tenant.json``
+puede fijar la base de Airtable de sus mensajes (``{"airtable_base_id": ...}``)
+y el título de la página (``"title"``; por defecto, el nombre de su perfil).
+
+Nada se carga por tenant al arrancar: la carpeta se valida la primera vez
+que se pide y las cachés (tablas, fragmentos, imágenes) son las globales del
+proceso, con las claves separadas por carpeta. El presupuesto de memoria es
+el mismo con 1 o con 500 tenants; la LRU expulsa lo menos usado de cualquiera.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from typing import NamedTuple
+
+from utils.data import load_table, table_path
+from utils.images import IMAGES_DIR
+from utils.render import TEMPLATES_DIR
+from utils.settings import (AIRTABLE_BASE_ID, DATA_DIR, DEFAULT_TENANT_NAME,
+                            TENANT_DOMAIN, TENANTS_DIR)
+
+logger = logging.getLogger(__name__)
+
+# Nombres válidos: una etiqueta DNS (también evita rutas como ../)
+TENANT_NAME_RE = re.compile(r"[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?")
+
+TENANT_CONFIG = "tenant.json"
+
+
+class Tenant(NamedTuple):
+    """Un portfolio: nombre, carpetas de contenido, base de Airtable y título (opcional)"""
+    name: str
+    data_dir: str
+    images_dir: str
+    airtable_base_id: str
+    title: str = ""
+
+    def load_table(self, table_name):
+        """Tabla del tenant desde la caché compartida del proceso"""
+        return load_table(table_name, self.data_dir)
+
+    def table_path(self, table_name):
+        return table_path(table_name, self.data_dir)
+
+    def cache_key(self, name):
+        """Clave de caché de ``name`` dentro del espacio de nombres del tenant"""
+        return f"{self.name}/{name}" if self.name else name
+
+
+# Portfolio único (sin PORTFOLIO_TENANTS_DIR)
+DEFAULT_TENANT = Tenant("", DATA_DIR, IMAGES_DIR, AIRTABLE_BASE_ID)
+
+# Tenants ya validados: nombre -> Tenant (sólo los que existen en disco)
+_tenants = {}
+_lock = threading.Lock()
+
+
+def multi_tenant():
+    """True si el proceso sirve varios portfolios"""
+    return bool(TENANTS_DIR)
+
+
+def _read_config(root):
+    try:
+        with open(os.path.join(root, TENANT_CONFIG), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Configuración ilegible en %s: %s", root, e)
+        return {}
+
+
+def get_tenant(name):
+    """Tenant por nombre; None si el nombre no es válido o no tiene carpeta"""
+    if not multi_tenant():
+        return DEFAULT_TENANT
+    name = (name or "").strip().lower()
+    tenant = _tenants.get(name)
+    if tenant is not None:
+        return tenant
+    if not TENANT_NAME_RE.fullmatch(name):
+        return None
+    root = os.path.join(TENANTS_DIR, name)
+    data_dir = os.path.join(root, "Data")
+    if not os.path.isdir(data_dir):
+        # Los nombres inexistentes no se guardan: ?tenant=<aleatorio> no ocupa memoria
+        return None
+    config = _read_config(root)
+    tenant = Tenant(name, data_dir, os.path.join(root, "Images"),
+                    config.get("airtable_base_id") or AIRTABLE_BASE_ID,
+                    str(config.get("title") or ""))
+    with _lock:
+        return _tenants.setdefault(name, tenant)
+
+
+def tenant_name(host="", requested=None):
+    """Nombre del tenant pedido: subdominio, luego ``?tenant=`` y luego el de por defecto"""
+    host = (host or "").split(":", 1)[0].strip().lower()
+    if TENANT_DOMAIN and host.endswith(f".{TENANT_DOMAIN}"):
+        return host[:-len(TENANT_DOMAIN) - 1]
+    return requested or DEFAULT_TENANT_NAME
+
+
+def resolve_tenant(host="", requested=None):
+    """Tenant de una petición (host y query param); None si no existe"""
+    return get_tenant(tenant_name(host, requested))
+
+
+def watched_dirs():
+    """Carpetas que vigila el observador de archivos (las plantillas, siempre)"""
+    if multi_tenant():
+        return [TENANTS_DIR, TEMPLATES_DIR]
+    return [DATA_DIR, IMAGES_DIR, TEMPLATES_DIR]
@@ -0,0 +1,109 @@
+"""Precalentamiento de las cachés de proceso antes de recibir tráfico
+
+``warm_up`` carga todas las tablas, normaliza los registros, construye los
+índices de búsqueda y renderiza todos los fragmentos (lo que genera o
+codifica las imágenes), de modo que el primer visitante tras un reinicio no
+paga esos costes. El estado (``warmup_status``) y el desglose de tiempos por
+fase los publica tools.serve en su endpoint de readiness.
+"""
+import logging
+import threading
+import time
+
+from utils import metrics
+from utils.fragments import PAGINATED, SECTIONS, page_count, section_fragment, section_records
+from utils.search import SEARCH_FIELDS, section_index
+from utils.styles import head_html
+from utils.tenants import DEFAULT_TENANT
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+
+# Histogramas cuyo tiempo se atribuye a la fase "images"
+IMAGE_HISTOGRAMS = ("image_encode_seconds", "image_resize_seconds")
+
+_state = {"status": PENDING, "started_at": None, "seconds": None, "phases": {}, "errors": []}
+_lock = threading.Lock()
+
+metrics.callback("warmup_ready", lambda: int(_state["status"] == READY),
+                 "1 cuando el precalentamiento ha terminado")
+
+
+def warmup_status():
+    """Copia del estado: status, segundos totales, segundos por fase y errores"""
+    with _lock:
+        return {**_state, "phases": dict(_state["phases"]), "errors": list(_state["errors"])}
+
+
+def is_ready():
+    return _state["status"] == READY
+
+
+def _image_seconds():
+    snapshot = metrics.snapshot()
+    return sum(snapshot.get(name, {}).get("sum", 0.0) for name in IMAGE_HISTOGRAMS)
+
+
+def _run_phase(phase, steps):
+    """Ejecuta los pasos de una fase; un paso que falla se anota y no detiene el resto"""
+    start = time.perf_counter()
+    with metrics.span(f"warmup_{phase}", f"Precalentamiento: fase {phase}"):
+        for label, step in steps:
+            try:
+                step()
+            except Exception as e:
+                logger.warning("Precalentamiento %s (%s) falló: %s", phase, label, e)
+                with _lock:
+                    _state["errors"].append(f"{phase}/{label}: {e}")
+    with _lock:
+        phases = _state["phases"]
+        phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start
+
+
+def _warm_pages(name, tenant):
+    """Renderiza todas las páginas de una sección paginada (se muestran siempre por páginas)"""
+    for page in range(page_count(name, tenant.load_table)):
+        section_fragment(name, page=page, tenant=tenant)
+
+
+def _fragment_steps(tenant):
+    # Contar las páginas lee la tabla: se hace dentro del paso para que una
+    # tabla rota quede anotada como error de la fase y no detenga warm_up
+    for name in SECTIONS:
+        if name in PAGINATED:
+            yield name, lambda name=name: _warm_pages(name, tenant)
+        else:
+            yield name, lambda name=name: section_fragment(name, tenant=tenant)
+
+
+def warm_up(tenants=(DEFAULT_TENANT,)):
+    """Precalienta estilos y, para cada tenant, tablas, registros, índices y fragmentos"""
+    with _lock:
+        _state.update(status=RUNNING, started_at=time.time(), seconds=None,
+                      phases={}, errors=[])
+    start = time.perf_counter()
+    _run_phase("styles", [("head", head_html)])
+    for tenant in tenants:
+        prefix = f"{tenant.name}/" if tenant.name else ""
+        tables = {table_name for table_name, _, _ in SECTIONS.values()}
+        _run_phase("tables", [(prefix + t, lambda t=t: tenant.load_table(t)) for t in tables])
+        _run_phase("records", [(prefix + name, lambda name=name: section_records(
+            name, tenant.load_table)) for name in SECTIONS])
+        _run_phase("search", [(prefix + name, lambda name=name: section_index(
+            name, tenant.load_table)) for name in SEARCH_FIELDS])
+        images_before = _image_seconds()
+        _run_phase("fragments", [(prefix + label, step)
+                                 for label, step in _fragment_steps(tenant)])
+        # Parte de "fragments" dedicada a redimensionar y codificar imágenes
+        with _lock:
+            phases = _state["phases"]
+            phases["images"] = phases.get("images", 0.0) + _image_seconds() - images_before
+
+    seconds = time.perf_counter() - start
+    metrics.histogram("warmup_seconds", "Precalentamiento completo").observe(seconds)
+    with _lock:
+        _state.update(status=READY, seconds=seconds)
+    return warmup_status()
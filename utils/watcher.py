@@ -0,0 +1,76 @@
+"""Invalidación de cachés dirigida por cambios en disco (watchdog)
+
+Los módulos registran con ``on_file_change`` una función que recibe la ruta
+absoluta modificada y descarta sólo las entradas que dependen de ella.
+Mientras el observador está activo las cachés no necesitan revalidarse con
+``os.stat`` en cada rerun.
+"""
+import logging
+import os
+import threading
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+logger = logging.getLogger(__name__)
+
+# Eventos que implican cambios de contenido (watchdog también emite opened/closed)
+CHANGE_EVENTS = {"created", "modified", "deleted", "moved", "closed"}
+
+_invalidators = []
+_observer = None
+_lock = threading.Lock()
+
+
+def on_file_change(fn):
+    """Registra una función de invalidación (se usa como decorador)"""
+    _invalidators.append(fn)
+    return fn
+
+
+def notify(path):
+    """Propaga el cambio de un archivo a todas las cachés registradas"""
+    path = os.path.abspath(path)
+    for invalidate in _invalidators:
+        try:
+            invalidate(path)
+        except Exception as e:
+            logger.warning("Error invalidando cachés para %s: %s", path, e)
+
+
+class _InvalidationHandler(FileSystemEventHandler):
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in CHANGE_EVENTS:
+            return
+        notify(event.src_path)
+        if getattr(event, "dest_path", ""):
+            notify(event.dest_path)
+
+
+def is_watching():
+    """True si el observador de archivos está en marcha"""
+    return _observer is not None and _observer.is_alive()
+
+
+def start_watcher(paths):
+    """Arranca (una sola vez por proceso) el observador sobre las carpetas dadas"""
+    global _observer
+    if is_watching():
+        return True
+    with _lock:
+        if is_watching():
+            return True
+        try:
+            observer = Observer()
+            observer.daemon = True
+            handler = _InvalidationHandler()
+            for path in paths:
+                if os.path.isdir(path):
+                    observer.schedule(handler, path, recursive=True)
+            observer.start()
+        except Exception as e:
+            # Sin observador las cachés se revalidan comparando mtime y tamaño
+            logger.warning("No se pudo iniciar el observador de archivos: %s", e)
+            return False
+        _observer = observer
+    return True